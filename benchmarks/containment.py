@@ -0,0 +1,121 @@
+"""
+Benchmark attribute containment queries with and without the indexes added
+in migration 0003.
+
+Runs against the example project's database, so point
+example/crosswalkapp/settings.py at a scratch Postgres database and migrate
+it first. Then, from the repository root:
+
+    $ python benchmarks/containment.py --rows 1000000
+
+Never run this against a live database. Dropping the indexes, even inside
+a transaction that is rolled back, holds an ACCESS EXCLUSIVE lock on the
+entity table while the unindexed queries run, blocking every read and
+write of entities.
+
+Entities are created in a "containment-benchmark" domain on the first run
+and reused afterward. Each query is timed with and without the indexes,
+and results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "example"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "crosswalkapp.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from crosswalk.models import Domain, Entity  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+
+DOMAIN = "containment-benchmark"
+STATES = ["AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA"]
+INDEXES = ["crosswalk_attributes_gin", "crosswalk_domain_alias"]
+
+
+class Rollback(Exception):
+    pass
+
+
+def populate(domain, rows, batch_size=10000):
+    existing = Entity.objects.filter(domain=domain).count()
+    for start in range(existing, rows, batch_size):
+        Entity.objects.bulk_create(
+            Entity(
+                domain=domain,
+                attributes={
+                    "name": "Entity {}".format(i),
+                    "state": STATES[i % len(STATES)],
+                    "group": i % 1000,
+                },
+            )
+            for i in range(start, min(start + batch_size, rows))
+        )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE {}".format(Entity._meta.db_table))
+
+
+def measure(domain, block_attrs, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = list(
+            Entity.objects.filter(
+                domain=domain, attributes__contains=block_attrs
+            ).values_list("uuid", flat=True)
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    if not rows:
+        sys.exit("No entities contain {}.".format(json.dumps(block_attrs)))
+    return {
+        "rows": len(rows),
+        "p50_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    domain, _ = Domain.objects.get_or_create(name=DOMAIN)
+    populate(domain, args.rows)
+
+    # Each query matches fewer entities than the last. Entity i is in
+    # group i % 1000 and state i % 10, so groups 4, 14, 24... are in CA.
+    queries = [
+        {"state": "AZ"},
+        {"group": 17},
+        {"state": "CA", "group": 4},
+        {"name": "Entity {}".format(args.rows // 2)},
+    ]
+    results = []
+    for block_attrs in queries:
+        result = {"block_attrs": block_attrs}
+        result["indexed"] = measure(domain, block_attrs, args.repeat)
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for index in INDEXES:
+                        cursor.execute("DROP INDEX IF EXISTS {}".format(index))
+                result["unindexed"] = measure(domain, block_attrs, args.repeat)
+                raise Rollback
+        except Rollback:
+            pass
+        results.append(result)
+
+    print(json.dumps({"rows": args.rows, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
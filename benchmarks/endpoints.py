@@ -0,0 +1,231 @@
+"""
+Benchmark the matching, bulk and listing endpoints.
+
+Runs against the example project's database, so point
+example/crosswalkapp/settings.py at a scratch Postgres database and migrate
+it first. Then, from the repository root:
+
+    $ python benchmarks/endpoints.py --entities 100000 --blocks 50
+
+A synthetic domain with the given number of entities, spread evenly over
+the given number of blocks, is created on the first run and reused
+afterward. Each endpoint is requested through Django's test client with
+authentication bypassed, and its throughput and p50 and p99 latency are
+printed as JSON, or written to --output, so results can be compared between
+releases.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "example"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "crosswalkapp.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from crosswalk.models import Domain, Entity  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+SCORERS = [
+    "fuzzywuzzy.default_process",
+    "fuzzywuzzy.partial_ratio_process",
+    "fuzzywuzzy.token_sort_ratio_process",
+    "fuzzywuzzy.token_set_ratio_process",
+]
+WORDS = [
+    "north",
+    "south",
+    "river",
+    "lake",
+    "county",
+    "city",
+    "valley",
+    "union",
+    "mount",
+    "park",
+]
+
+
+def entity_name(i):
+    """A name of a few words that's unique for each i."""
+    words = [WORDS[(i // 10 ** n) % len(WORDS)] for n in range(3)]
+    return "{} {}".format(" ".join(words).title(), i)
+
+
+def misspell(name, rng):
+    """Drop a random character, as a query that should fuzzy match."""
+    i = rng.randrange(len(name))
+    return name[:i] + name[i + 1 :]
+
+
+def populate(domain, entities, blocks, batch_size=10000):
+    existing = Entity.objects.filter(domain=domain).count()
+    for start in range(existing, entities, batch_size):
+        Entity.objects.bulk_create(
+            Entity(
+                domain=domain,
+                # A string, so blocks can be listed by query parameter.
+                attributes={"name": entity_name(i), "block": str(i % blocks)},
+            )
+            for i in range(start, min(start + batch_size, entities))
+        )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE {}".format(Entity._meta.db_table))
+
+
+def percentile(timings, p):
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * p / 100))]
+
+
+def measure(client, method, url, payloads, warmup=1):
+    """Request an endpoint once per payload and summarize the timings."""
+    for data in payloads[:warmup]:
+        getattr(client, method)(url, data, format="json")
+    timings, statuses = [], set()
+    started = time.perf_counter()
+    for data in payloads[warmup:]:
+        start = time.perf_counter()
+        response = getattr(client, method)(url, data, format="json")
+        timings.append((time.perf_counter() - start) * 1000)
+        statuses.add(response.status_code)
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(timings),
+        "statuses": sorted(statuses),
+        "throughput_rps": round(len(timings) / elapsed, 2),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--entities", type=int, default=100000)
+    parser.add_argument("--blocks", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--bulk-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results to this file.")
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    user, _ = User.objects.get_or_create(username="endpoint-benchmark")
+    domain, _ = Domain.objects.get_or_create(
+        name="endpoint-benchmark-{}-{}".format(args.entities, args.blocks)
+    )
+    populate(domain, args.entities, args.blocks)
+    scratch = Domain.objects.create(
+        name="endpoint-benchmark-scratch-{}".format(uuid.uuid4().hex)
+    )
+
+    client = APIClient()
+    client.force_authenticate(user)
+
+    def url(domain, endpoint=""):
+        return "/api/domains/{}/entities/{}".format(domain.slug, endpoint)
+
+    def sample(n):
+        indexes = [rng.randrange(args.entities) for _ in range(n)]
+        return [
+            (entity_name(i), {"block": str(i % args.blocks)}) for i in indexes
+        ]
+
+    queries = args.repeat + 1
+    results = {}
+    try:
+        results["match"] = measure(
+            client,
+            "post",
+            url(domain, "match/"),
+            [
+                {
+                    "query_field": "name",
+                    "query_value": name,
+                    "block_attrs": block,
+                }
+                for name, block in sample(queries)
+            ],
+        )
+        for scorer in SCORERS:
+            results["best-match ({})".format(scorer)] = measure(
+                client,
+                "post",
+                url(domain, "best-match/"),
+                [
+                    {
+                        "query_field": "name",
+                        "query_value": misspell(name, rng),
+                        "block_attrs": block,
+                        "scorer": scorer,
+                    }
+                    for name, block in sample(queries)
+                ],
+            )
+        results["bulk-create ({} entities)".format(args.bulk_size)] = measure(
+            client,
+            "post",
+            url(scratch, "bulk-create/"),
+            [
+                [
+                    {"name": entity_name(i), "batch": batch}
+                    for i in range(args.bulk_size)
+                ]
+                for batch in range(queries)
+            ],
+        )
+        results["alias-or-create"] = measure(
+            client,
+            "post",
+            url(scratch, "alias-or-create/"),
+            [
+                {
+                    "query_field": "name",
+                    "query_value": misspell(entity_name(i), rng),
+                    "block_attrs": {"batch": batch},
+                    "threshold": 90,
+                }
+                for batch in range(queries)
+                for i in [rng.randrange(args.bulk_size)]
+            ],
+        )
+        results["list (one block)"] = measure(
+            client,
+            "get",
+            url(domain),
+            [
+                {"block": str(rng.randrange(args.blocks))}
+                for _ in range(queries)
+            ],
+        )
+    finally:
+        Entity.objects.filter(domain=scratch).delete()
+        scratch.delete()
+
+    report = {
+        "entities": args.entities,
+        "blocks": args.blocks,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Check that bulk imports skip and report entities that already exist,
+whether chunks are inserted with bulk_create or with COPY.
+
+Runs against the example project's database, so point
+example/crosswalkapp/settings.py at a scratch Postgres database and migrate
+it first. Then, from the repository root:
+
+    $ python benchmarks/imports.py
+
+Results are printed as JSON, and the script exits with an error if an
+import fails or doesn't report the duplicate.
+"""
+import json
+import os
+import sys
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "example"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "crosswalkapp.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from crosswalk.models import Domain, Entity  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+DOMAIN = "import-check"
+
+
+def main():
+    user, _ = User.objects.get_or_create(username="import-check")
+    domain, _ = Domain.objects.get_or_create(name=DOMAIN)
+
+    client = APIClient()
+    client.force_authenticate(user)
+    url = "/api/domains/{}/entities/bulk-import/".format(domain.slug)
+
+    results, failed = [], False
+    for copy in (False, True):
+        Entity.objects.filter(domain=domain).delete()
+        Entity.objects.create(domain=domain, attributes={"name": "Topeka"})
+        run = uuid.uuid4().hex
+        body = "\n".join(
+            json.dumps({"name": name})
+            for name in ("Wichita " + run, "Topeka", "Lawrence " + run)
+        )
+        response = client.post(
+            url + ("?copy=true" if copy else ""),
+            body,
+            content_type="application/x-ndjson",
+        )
+        data = response.data if response.status_code == 200 else None
+        results.append(
+            {"copy": copy, "status": response.status_code, "response": data}
+        )
+        failed = failed or not (
+            data
+            and data["created"] == 2
+            and [error["line"] for error in data["errors"]] == [2]
+        )
+
+    print(json.dumps(results, indent=2))
+    if failed:
+        sys.exit("An import didn't skip and report the duplicate.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Check the number of database queries each exact match, fuzzy match and
+bulk create endpoint runs.
+
+Runs against the example project's database, so point
+example/crosswalkapp/settings.py at a scratch Postgres database and migrate
+it first. Then, from the repository root:
+
+    $ python benchmarks/queries.py
+
+Requests are made with authentication and the domain cache already warm, so
+only the queries an endpoint runs itself are counted. The candidate index
+starts empty, so the first fuzzy match loads its block. Counts are printed as
+JSON, and the script exits with an error if any endpoint runs more or fewer
+queries than expected.
+"""
+import json
+import os
+import sys
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "example"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "crosswalkapp.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from crosswalk.candidates import candidate_index  # noqa: E402
+from crosswalk.models import Domain, Entity  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+DOMAIN = "query-count-check"
+
+# The number of queries each request runs. Deletes also query for the
+# aliases and superseded entities of the deleted entity. Fuzzy matches
+# fetch every matched entity in one query, plus one to load a block that
+# isn't cached. Bulk creates with on_conflict look up existing entities,
+# then insert new entities and fetch them back.
+EXPECTED = {
+    "match": 1,
+    "match (more than one)": 1,
+    "match-or-create (existing)": 1,
+    "match-or-create (created)": 2,
+    "update-match": 2,
+    "delete-match": 5,
+    "best-match (block loaded)": 2,
+    "best-match (block cached)": 1,
+    "best-match (limit)": 1,
+    "best-match batch": 1,
+    "best-match batch (limit)": 1,
+    "bulk-create": 1,
+    "bulk-create (on_conflict, existing)": 1,
+    "bulk-create (on_conflict, created)": 3,
+}
+
+
+def main():
+    user, _ = User.objects.get_or_create(username="query-count-check")
+    domain, _ = Domain.objects.get_or_create(name=DOMAIN)
+    Entity.objects.filter(domain=domain).delete()
+    run = uuid.uuid4().hex
+    Entity.objects.bulk_create(
+        Entity(domain=domain, attributes={"name": name, "state": "KS"})
+        for name in ("Topeka", "Wichita", "Wichita " + run)
+    )
+    Entity.objects.create(
+        domain=domain, attributes={"name": "Wichita", "state": "MO"}
+    )
+    Domain.objects.get_cached(slug=domain.slug)
+    candidate_index.invalidate()
+
+    client = APIClient()
+    client.force_authenticate(user)
+    url = "/api/domains/{}/entities/{{}}".format(domain.slug)
+    query = {"query_field": "name", "query_value": "Topka"}
+    requests = [
+        ("match", "match/", {"query_field": "name", "query_value": "Topeka"}),
+        (
+            "match (more than one)",
+            "match/",
+            {"query_field": "name", "query_value": "Wichita"},
+        ),
+        (
+            "match-or-create (existing)",
+            "match-or-create/",
+            {"query_field": "name", "query_value": "Topeka"},
+        ),
+        (
+            "match-or-create (created)",
+            "match-or-create/",
+            {"query_field": "name", "query_value": "Lawrence " + run},
+        ),
+        (
+            "update-match",
+            "update-match/",
+            {
+                "block_attrs": {"name": "Topeka"},
+                "update_attrs": {"capital": True},
+            },
+        ),
+        ("delete-match", "delete-match/", {"name": "Wichita " + run}),
+        ("best-match (block loaded)", "best-match/", query),
+        ("best-match (block cached)", "best-match/", query),
+        ("best-match (limit)", "best-match/", {**query, "limit": 3}),
+        ("best-match batch", "best-match/batch/", {"queries": [query] * 3}),
+        (
+            "best-match batch (limit)",
+            "best-match/batch/",
+            {"queries": [query] * 3, "limit": 3},
+        ),
+        ("bulk-create", "bulk-create/", [{"name": "Salina " + run}]),
+        (
+            "bulk-create (on_conflict, existing)",
+            "bulk-create/?on_conflict=skip",
+            [{"name": "Salina " + run}],
+        ),
+        (
+            "bulk-create (on_conflict, created)",
+            "bulk-create/?on_conflict=skip",
+            [{"name": "Hays " + run}],
+        ),
+    ]
+
+    results, failed = [], False
+    for name, endpoint, data in requests:
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(url.format(endpoint), data, format="json")
+        results.append(
+            {
+                "request": name,
+                "status": response.status_code,
+                "queries": len(queries),
+                "expected": EXPECTED[name],
+            }
+        )
+        failed = failed or len(queries) != EXPECTED[name]
+
+    print(json.dumps(results, indent=2))
+    if failed:
+        sys.exit("An endpoint didn't run the expected number of queries.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark serializing entities with EntitySerializer against the
+query-free serialize_entities used by the list and match endpoints.
+
+Runs against the example project's database, so point
+example/crosswalkapp/settings.py at a scratch Postgres database and migrate
+it first. Then, from the repository root:
+
+    $ python benchmarks/serialization.py --rows 100000
+
+Entities are created in a "serialization-benchmark" domain on the first run
+and reused afterward. Results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "example"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "crosswalkapp.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from crosswalk.models import Domain, Entity  # noqa: E402
+from crosswalk.serializers import (  # noqa: E402
+    EntitySerializer,
+    serialize_entities,
+)
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+DOMAIN = "serialization-benchmark"
+
+
+def populate(domain, rows, batch_size=10000):
+    existing = Entity.objects.filter(domain=domain).count()
+    for start in range(existing, rows, batch_size):
+        Entity.objects.bulk_create(
+            Entity(
+                domain=domain,
+                attributes={"name": "Entity {}".format(i), "group": i % 100},
+            )
+            for i in range(start, min(start + batch_size, rows))
+        )
+
+
+def measure(serialize, queryset):
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        data = serialize(queryset)
+        seconds = time.perf_counter() - start
+    return {
+        "entities": len(data),
+        "seconds": round(seconds, 3),
+        "entities_per_second": round(len(data) / seconds),
+        "queries": len(queries),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    domain, _ = Domain.objects.get_or_create(name=DOMAIN)
+    populate(domain, args.rows)
+    queryset = Entity.objects.filter(domain=domain)[: args.rows]
+
+    results = {
+        "EntitySerializer": measure(
+            lambda qs: EntitySerializer(qs, many=True).data, queryset
+        ),
+        "serialize_entities": measure(serialize_entities, queryset),
+    }
+    print(json.dumps({"rows": args.rows, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Check that bulk creates with on_conflict match entities by a UUID passed
+by the client, updating, skipping or reporting them, and that bulk creates
+and batch best match or creates report entities created with a client
+UUID as created.
+
+Runs against the example project's database, so point
+example/crosswalkapp/settings.py at a scratch Postgres database and migrate
+it first. Then, from the repository root:
+
+    $ python benchmarks/upserts.py
+
+Results are printed as JSON, and the script exits with an error if any
+response isn't as expected.
+"""
+import json
+import os
+import sys
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "example"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "crosswalkapp.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from crosswalk.models import Domain, Entity  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+DOMAIN = "upsert-check"
+
+
+def bulk_create(client, domain, on_conflict, entity):
+    response = client.post(
+        "/api/domains/{}/entities/bulk-create/?on_conflict={}".format(
+            domain.slug, on_conflict
+        ),
+        [entity],
+        format="json",
+    )
+    return response.status_code, response.data
+
+
+def main():
+    user, _ = User.objects.get_or_create(username="upsert-check")
+    domain, _ = Domain.objects.get_or_create(name=DOMAIN)
+    Entity.objects.filter(domain=domain).delete()
+    existing = Entity.objects.create(
+        domain=domain, attributes={"name": "Topeka"}
+    )
+    pk, new_pk = str(existing.pk), str(uuid.uuid4())
+
+    client = APIClient()
+    client.force_authenticate(user)
+
+    # Each case is the on_conflict mode, the entity posted and a check of
+    # the status and response.
+    cases = [
+        (
+            "skip",
+            {"uuid": pk, "name": "Topeka, Kansas"},
+            lambda status, data: status == 200
+            and data["entities"][0]["entity"]["uuid"] == pk
+            and data["entities"][0]["entity"]["attributes"]
+            == {"name": "Topeka"}
+            and not data["entities"][0]["created"]
+            and not data["entities"][0]["updated"],
+        ),
+        (
+            "report",
+            {"uuid": pk, "name": "Topeka, Kansas"},
+            lambda status, data: status == 409
+            and [c["index"] for c in data["conflicts"]] == [0],
+        ),
+        (
+            "update",
+            {"uuid": pk, "name": "Topeka, Kansas"},
+            lambda status, data: status == 200
+            and data["entities"][0]["entity"]["uuid"] == pk
+            and data["entities"][0]["entity"]["attributes"]
+            == {"name": "Topeka, Kansas"}
+            and not data["entities"][0]["created"]
+            and data["entities"][0]["updated"],
+        ),
+        (
+            "skip",
+            {"uuid": new_pk, "name": "Wichita"},
+            lambda status, data: status == 200
+            and data["entities"][0]["entity"]["uuid"] == new_pk
+            and data["entities"][0]["created"],
+        ),
+    ]
+
+    results, failed = [], False
+    for on_conflict, entity, check in cases:
+        status, data = bulk_create(client, domain, on_conflict, entity)
+        passed = bool(check(status, data))
+        failed = failed or not passed
+        results.append(
+            {
+                "on_conflict": on_conflict,
+                "uuid": entity["uuid"],
+                "status": status,
+                "passed": passed,
+            }
+        )
+
+    batch_pk = str(uuid.uuid4())
+    response = client.post(
+        "/api/domains/{}/entities/best-match-or-create/batch/".format(
+            domain.slug
+        ),
+        {
+            "queries": [
+                {
+                    "query_field": "name",
+                    "query_value": "Lawrence",
+                    "create_attrs": {"uuid": batch_pk},
+                }
+            ],
+            "threshold": 101,
+        },
+        format="json",
+    )
+    passed = (
+        response.status_code == 200
+        and response.data["results"][0]["entity"]["uuid"] == batch_pk
+        and response.data["results"][0]["created"]
+    )
+    failed = failed or not passed
+    results.append(
+        {
+            "endpoint": "best-match-or-create/batch",
+            "uuid": batch_pk,
+            "status": response.status_code,
+            "passed": passed,
+        }
+    )
+
+    print(json.dumps(results, indent=2))
+    if failed:
+        sys.exit("An endpoint didn't handle a client UUID as expected.")
+
+
+if __name__ == "__main__":
+    main()
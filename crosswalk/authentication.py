@@ -1,11 +1,76 @@
+from django.conf import settings
+from django.core.cache import caches
 from django.core.exceptions import ObjectDoesNotExist
 from rest_framework import authentication, exceptions
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 
+from .cache import LRUCache
+from .metrics import InstrumentedViewMixin
 from .models import ApiUser
 
 
+class TokenCache(LRUCache):
+    """
+    Per-process cache of API tokens to users, or a cache shared between
+    processes if CROSSWALK_TOKEN_CACHE_BACKEND names a Django cache.
+
+    Entries are invalidated when an ApiUser or User is saved or deleted.
+    """
+
+    key_prefix = "crosswalk:token:"
+
+    @property
+    def maxsize(self):
+        return getattr(settings, "CROSSWALK_TOKEN_CACHE_SIZE", 1024)
+
+    @property
+    def ttl(self):
+        return getattr(settings, "CROSSWALK_TOKEN_CACHE_TTL", 60)
+
+    @property
+    def shared(self):
+        backend = getattr(settings, "CROSSWALK_TOKEN_CACHE_BACKEND", None)
+        return caches[backend] if backend else None
+
+    def get_user(self, token):
+        """Return the user for a token, raising ObjectDoesNotExist if none."""
+        shared = self.shared
+        if shared is None:
+            user = self.get(token)
+        else:
+            # Skip the local cache so invalidations reach every process.
+            user = shared.get(self.key_prefix + token)
+            if user is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if user is not None:
+            return user
+        user = ApiUser.objects.select_related("user").get(token=token).user
+        if shared is None:
+            self.set(token, user)
+        else:
+            shared.set(self.key_prefix + token, user, self.ttl)
+        return user
+
+    def invalidate(self, token):
+        self.delete(token)
+        if self.shared is not None:
+            self.shared.delete(self.key_prefix + token)
+
+    def invalidate_user(self, user):
+        self.delete_where(lambda cached: cached.pk == user.pk)
+        if self.shared is not None:
+            for token in ApiUser.objects.filter(user=user).values_list(
+                "token", flat=True
+            ):
+                self.shared.delete(self.key_prefix + token)
+
+
+token_cache = TokenCache()
+
+
 class TokenAuthentication(authentication.BaseAuthentication):
     def authenticate(self, request):
         # Of format "TOKEN <SOME TOKEN>"
@@ -15,12 +80,12 @@ class TokenAuthentication(authentication.BaseAuthentication):
                 "Missing authorization header"
             )
         try:
-            user = ApiUser.objects.get(token=token.split(" ")[1]).user
+            user = token_cache.get_user(token.split(" ")[1])
         except ObjectDoesNotExist:
             raise exceptions.AuthenticationFailed("Unauthorized")
         return (user, None)
 
 
-class AuthenticatedView(APIView):
+class AuthenticatedView(InstrumentedViewMixin, APIView):
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
@@ -0,0 +1,105 @@
+"""
+Blocking strategies, which narrow the candidates scored for a fuzzy match
+to those likely to match a query.
+
+Each strategy returns the keys of a normalized value. Keys for every
+strategy are computed when an entity is saved, and a domain's blocking
+strategies decide which of them a query's candidates must share.
+Strategies with a ``query_keys`` attribute look up different keys for a
+query than they store, such as neighbouring length bands.
+"""
+
+import zlib
+
+# Number of trigrams kept in an n-gram signature.
+NGRAM_SIGNATURE_SIZE = 4
+
+# Number of characters in each length band.
+LENGTH_BAND_WIDTH = 4
+
+SOUNDEX_DIGITS = {
+    letter: digit
+    for letters, digit in (
+        ("bfpv", "1"),
+        ("cgjkqsxz", "2"),
+        ("dt", "3"),
+        ("l", "4"),
+        ("mn", "5"),
+        ("r", "6"),
+    )
+    for letter in letters
+}
+
+
+def soundex_code(word):
+    """Return the Soundex code of a word, or None if it has no letters."""
+    letters = [c for c in word if c.isalpha()]
+    if not letters:
+        return None
+    code = letters[0].upper()
+    last = SOUNDEX_DIGITS.get(letters[0])
+    for letter in letters[1:]:
+        digit = SOUNDEX_DIGITS.get(letter)
+        if digit is not None and digit != last:
+            code += digit
+        # H and W don't separate letters with the same code; vowels do.
+        if letter not in "hw":
+            last = digit
+    return (code + "000")[:4]
+
+
+def first_letter(normalized):
+    """The first character of a value."""
+    return [normalized[0]] if normalized else []
+
+
+def soundex(normalized):
+    """The Soundex code of each word, so words that sound alike match."""
+    return sorted(
+        {code for code in map(soundex_code, normalized.split()) if code}
+    )
+
+
+def ngram(normalized):
+    """
+    A MinHash signature of a value's character trigrams: the few with the
+    smallest hashes, which similar values likely have in common.
+    """
+    trigrams = {
+        normalized[i : i + 3] for i in range(max(1, len(normalized) - 2))
+    }
+    trigrams.discard("")
+    signature = sorted(trigrams, key=lambda t: zlib.crc32(t.encode("utf-8")))
+    return signature[:NGRAM_SIGNATURE_SIZE]
+
+
+def length_band(normalized):
+    """A value's length, rounded down to a band."""
+    return [str(len(normalized) // LENGTH_BAND_WIDTH)] if normalized else []
+
+
+def _length_band_query_keys(normalized):
+    # Look in neighbouring bands too, so values just across a band's edge
+    # still match.
+    if not normalized:
+        return []
+    band = len(normalized) // LENGTH_BAND_WIDTH
+    return [str(b) for b in range(max(0, band - 1), band + 2)]
+
+
+length_band.query_keys = _length_band_query_keys
+
+STRATEGIES = {
+    "first_letter": first_letter,
+    "soundex": soundex,
+    "ngram": ngram,
+    "length_band": length_band,
+}
+
+STRATEGY_CHOICES = [(name, name.replace("_", " ")) for name in STRATEGIES]
+
+
+def query_keys(name, normalized):
+    """Return the keys to look up for a normalized query value."""
+    strategy = STRATEGIES[name]
+    return getattr(strategy, "query_keys", strategy)(normalized)
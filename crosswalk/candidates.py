@@ -0,0 +1,340 @@
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, defaultdict, namedtuple
+
+from django.conf import settings
+from django.contrib.postgres.fields.jsonb import KeyTextTransform
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import TextField
+from django.db.models.functions import Cast
+
+from crosswalk.blocking import query_keys
+from crosswalk.fields import blocking_hash, normalize, token_sort
+from crosswalk.models import Entity
+
+# Values of the query field for each candidate, along with their normalized
+# and token-sorted forms so scorers that accept them skip processing, and an
+# index of the candidates containing each token.
+Candidates = namedtuple(
+    "Candidates", ("uuids", "values", "normalized", "token_sorted", "tokens")
+)
+
+CANDIDATE_FIELDS = ("uuid", "attributes", "normalized")
+
+
+def prepared_forms(value, normalized=None):
+    """
+    Return the normalized and token-sorted forms of a candidate value,
+    using the form stored on the entity if there is one.
+    """
+    if normalized is None:
+        normalized = normalize(value)
+    return normalized, token_sort(normalized)
+
+
+class TokenIndex(object):
+    """
+    Inverted index from each token of candidates' normalized values to the
+    positions of the candidates containing it, built on first use.
+    """
+
+    def __init__(self, normalized):
+        self._normalized = normalized
+        self._postings = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._postings is None:
+                postings = defaultdict(list)
+                for position, value in enumerate(self._normalized):
+                    for token in set(value.split()):
+                        postings[token].append(position)
+                self._postings = postings
+            return self._postings
+
+    def sharing(self, tokens, min_share=0, max_frequency=1):
+        """
+        Return the positions of the candidates sharing tokens with a query,
+        or None if no candidate does.
+
+        Tokens are weighted by inverse document frequency, and tokens found
+        in more than max_frequency of the candidates, like "county" or
+        "inc", are skipped. A candidate must share at least min_share of
+        the total weight of the query's tokens, and at least one token.
+        """
+        postings = self._load()
+        total = len(self._normalized)
+        weights = {}
+        for token in set(tokens):
+            frequency = len(postings.get(token, ()))
+            if frequency > max_frequency * total:
+                continue
+            # Tokens no candidate has count as the rarest possible.
+            weights[token] = math.log(total / max(frequency, 1))
+
+        shared = defaultdict(float)
+        for token, weight in weights.items():
+            for position in postings.get(token, ()):
+                shared[position] += weight
+        required = min_share * sum(weights.values())
+        positions = sorted(
+            position
+            for position, weight in shared.items()
+            if weight > 0 and weight >= required
+        )
+        return positions or None
+
+
+def contains(value, other):
+    """Mirror Postgres' jsonb containment operator (@>) for shallow values."""
+    if isinstance(other, dict):
+        return isinstance(value, dict) and all(
+            key in value and contains(value[key], other[key]) for key in other
+        )
+    if isinstance(other, list):
+        if not isinstance(value, list):
+            return False
+        return all(any(contains(v, o) for v in value) for o in other)
+    if isinstance(value, bool) or isinstance(other, bool):
+        return value is other
+    return value == other
+
+
+class CandidateBlock(object):
+    """
+    Values of a query field for every entity in a block, keyed by UUID.
+    """
+
+    def __init__(self, query_field, block_attrs):
+        self.query_field = query_field
+        self.block_attrs = block_attrs
+        self.built = time.monotonic()
+        self._values = OrderedDict()
+        self._forms = {}
+        self._snapshot = None
+
+    def accepts(self, attributes):
+        return self.query_field in attributes and contains(
+            attributes, self.block_attrs
+        )
+
+    def add(self, uuid, attributes, normalized):
+        value = attributes[self.query_field]
+        self._values[uuid] = value
+        self._forms[uuid] = prepared_forms(
+            value, normalized.get(self.query_field)
+        )
+        self._snapshot = None
+
+    def discard(self, uuid):
+        if uuid in self._values:
+            del self._values[uuid]
+            del self._forms[uuid]
+            self._snapshot = None
+
+    def __len__(self):
+        return len(self._values)
+
+    def snapshot(self):
+        if self._snapshot is None:
+            forms = [self._forms[uuid] for uuid in self._values]
+            normalized = [normalized for normalized, _ in forms]
+            self._snapshot = Candidates(
+                list(self._values.keys()),
+                list(self._values.values()),
+                normalized,
+                [token_sorted for _, token_sorted in forms],
+                TokenIndex(normalized),
+            )
+        return self._snapshot
+
+
+class CandidateIndex(object):
+    """
+    Per-process cache of fuzzy match candidates.
+
+    Blocks are built lazily from the database the first time a
+    (domain, query_field, block_attrs) combination is queried and are kept
+    up to date by the Entity save and delete signals in this process.
+    Because other processes can't notify us, blocks also expire after
+    CROSSWALK_CANDIDATE_INDEX_TTL seconds.
+    """
+
+    def __init__(self):
+        self._blocks = OrderedDict()
+        self._lock = threading.RLock()
+
+    @property
+    def enabled(self):
+        return getattr(settings, "CROSSWALK_CANDIDATE_INDEX", True)
+
+    @property
+    def ttl(self):
+        return getattr(settings, "CROSSWALK_CANDIDATE_INDEX_TTL", 60)
+
+    @property
+    def max_blocks(self):
+        return getattr(settings, "CROSSWALK_CANDIDATE_INDEX_MAX_BLOCKS", 128)
+
+    @staticmethod
+    def block_key(domain_id, query_field, block_attrs):
+        return (
+            domain_id,
+            query_field,
+            json.dumps(block_attrs, sort_keys=True),
+        )
+
+    def get(self, domain, query_field, block_attrs):
+        """Return the candidates for a query in a domain block."""
+        key = self.block_key(domain.pk, query_field, block_attrs)
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is not None and not self._expired(block):
+                self._blocks.move_to_end(key)
+                return block.snapshot()
+
+        block = self._build(domain, query_field, block_attrs)
+        # Snapshot before publishing the block, after which the save and
+        # delete signals of other threads can change it.
+        snapshot = block.snapshot()
+        if self.enabled:
+            with self._lock:
+                self._blocks[key] = block
+                self._blocks.move_to_end(key)
+                while len(self._blocks) > self.max_blocks:
+                    self._blocks.popitem(last=False)
+        return snapshot
+
+    def update(self, entity):
+        """Add or refresh a saved entity in the cached blocks it belongs to."""
+        with self._lock:
+            for (domain_id, _, _), block in self._blocks.items():
+                block.discard(entity.pk)
+                if domain_id == entity.domain_id and block.accepts(
+                    entity.attributes
+                ):
+                    block.add(entity.pk, entity.attributes, entity.normalized)
+
+    def discard(self, entity):
+        """Remove a deleted entity from every cached block."""
+        with self._lock:
+            for block in self._blocks.values():
+                block.discard(entity.pk)
+
+    def invalidate(self, domain=None):
+        """Drop cached blocks for a domain, or for all domains."""
+        with self._lock:
+            if domain is None:
+                self._blocks.clear()
+                return
+            for key in [k for k in self._blocks if k[0] == domain.pk]:
+                del self._blocks[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "blocks": len(self._blocks),
+                "candidates": sum(len(b) for b in self._blocks.values()),
+            }
+
+    def _expired(self, block):
+        return self.ttl is not None and (
+            time.monotonic() - block.built > self.ttl
+        )
+
+    def _build(self, domain, query_field, block_attrs):
+        block = CandidateBlock(query_field, block_attrs)
+        entities = Entity.objects.filter(
+            domain=domain,
+            attributes__contains=block_attrs,
+            attributes__has_key=query_field,
+        ).values_list(*CANDIDATE_FIELDS)
+        for uuid, attributes, normalized in entities.iterator():
+            block.add(uuid, attributes, normalized)
+        return block
+
+
+candidate_index = CandidateIndex()
+
+
+def trigram_candidates(domain, query_field, query_value, block_attrs, limit):
+    """
+    Return the candidates in a domain block most similar to a query by
+    pg_trgm similarity, ranked in the database.
+
+    The trigram_similar filter can use a GIN trigram index on the query
+    field, created with the crosswalk_trigram_index management command. If
+    no value passes pg_trgm's similarity threshold, the most similar values
+    are returned anyway so a block is never empty because of the prefilter.
+    """
+    entities = (
+        Entity.objects.filter(
+            domain=domain,
+            attributes__contains=block_attrs,
+            attributes__has_key=query_field,
+        )
+        # Cast so lookups resolve against text rather than as JSON keys.
+        .annotate(
+            query_field_value=Cast(
+                KeyTextTransform(query_field, "attributes"), TextField()
+            )
+        )
+        .annotate(
+            similarity=TrigramSimilarity("query_field_value", query_value)
+        )
+        .order_by("-similarity")
+    )
+    rows = list(
+        entities.filter(
+            query_field_value__trigram_similar=query_value
+        ).values_list(*CANDIDATE_FIELDS)[:limit]
+    )
+    if not rows:
+        rows = list(entities.values_list(*CANDIDATE_FIELDS)[:limit])
+    return candidates_from_rows(query_field, rows)
+
+
+def blocked_candidates(
+    domain, query_field, query_value, block_attrs, blocking
+):
+    """
+    Return the candidates in a domain block that share a key with a query
+    under each of a list of blocking strategies, found in the database with
+    the GIN index on entities' blocking keys.
+
+    A strategy that has no keys for the query, as when soundex is given a
+    number, is skipped.
+    """
+    normalized = normalize(query_value)
+    entities = Entity.objects.filter(
+        domain=domain,
+        attributes__contains=block_attrs,
+        attributes__has_key=query_field,
+    )
+    for strategy in blocking:
+        keys = [
+            blocking_hash(query_field, strategy, key)
+            for key in query_keys(strategy, normalized)
+        ]
+        if keys:
+            entities = entities.filter(blocking_keys__overlap=keys)
+    return candidates_from_rows(
+        query_field, entities.values_list(*CANDIDATE_FIELDS).iterator()
+    )
+
+
+def candidates_from_rows(query_field, rows):
+    uuids, values, normalized, token_sorted = [], [], [], []
+    for uuid, attributes, stored in rows:
+        value = attributes[query_field]
+        forms = prepared_forms(value, stored.get(query_field))
+        uuids.append(uuid)
+        values.append(value)
+        normalized.append(forms[0])
+        token_sorted.append(forms[1])
+    return Candidates(
+        uuids, values, normalized, token_sorted, TokenIndex(normalized)
+    )
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import uuid
+
+from crosswalk.blocking import STRATEGIES
+from django.contrib.postgres.fields import ArrayField, JSONField
+from django.db import models
+from fuzzywuzzy.utils import full_process
+
+
+def canonical_json(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+def attributes_hash(attributes):
+    """Hash an attributes dict to a UUID, independent of key order."""
+    digest = hashlib.md5(canonical_json(attributes).encode("utf-8"))
+    return uuid.UUID(bytes=digest.digest())
+
+
+def _int64_hash(key):
+    digest = hashlib.md5(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def lookup_hash(domain_id, field, value):
+    """Hash a (domain, attribute, value) triple to a signed 64-bit int."""
+    # jsonb compares numbers by value, so 1 and 1.0 must hash the same.
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return _int64_hash(
+        "{}\x00{}\x00{}".format(domain_id, field, canonical_json(value))
+    )
+
+
+def normalized_lookup_hash(domain_id, field, value):
+    """
+    Hash a (domain, attribute, value) triple to a signed 64-bit int, with the
+    value normalized for exact matches by normalized_key.
+    """
+    return _int64_hash(
+        "{}\x00{}\x00normalized\x00{}".format(
+            domain_id, field, normalized_key(value)
+        )
+    )
+
+
+def lookup_hashes(domain_id, attributes):
+    return sorted(
+        [
+            lookup_hash(domain_id, field, value)
+            for field, value in attributes.items()
+        ]
+        + [
+            normalized_lookup_hash(domain_id, field, value)
+            for field, value in attributes.items()
+            if isinstance(value, str)
+        ]
+    )
+
+
+def normalize(value):
+    """
+    Normalize a value the way fuzzywuzzy's scorers do before comparing it:
+    lowercased, with only letters and numbers, and trimmed.
+    """
+    return full_process(str(value), force_ascii=True)
+
+
+def normalized_key(value):
+    """
+    Normalize a value for exact matches, collapsing the runs of spaces that
+    normalize leaves where punctuation was removed, so "St. Louis" and
+    "st louis" have the same key.
+    """
+    return " ".join(normalize(value).split())
+
+
+def token_sort(normalized):
+    """Sort the tokens of a normalized value, as token_sort_ratio does."""
+    return " ".join(sorted(normalized.split()))
+
+
+def normalized_attributes(attributes):
+    return {
+        field: normalize(value)
+        for field, value in attributes.items()
+        if isinstance(value, str)
+    }
+
+
+def blocking_hash(field, strategy, key):
+    """Hash an (attribute, strategy, key) triple to a signed 64-bit int."""
+    return _int64_hash("{}\x00{}\x00{}".format(field, strategy, key))
+
+
+def blocking_keys(normalized):
+    """Hash the keys of every blocking strategy for normalized attributes."""
+    return sorted(
+        {
+            blocking_hash(field, name, key)
+            for field, value in normalized.items()
+            for name, strategy in STRATEGIES.items()
+            for key in strategy(value)
+        }
+    )
+
+
+class AttributesHashField(models.UUIDField):
+    """
+    Hash of an entity's attributes, computed whenever the entity is saved
+    or bulk created, so uniqueness can be enforced on a compact column.
+    """
+
+    def pre_save(self, model_instance, add):
+        value = attributes_hash(model_instance.attributes)
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class LookupHashesField(ArrayField):
+    """
+    Hashes of each of an entity's attributes, and of the normalized key of
+    each string attribute, computed whenever the entity is saved or bulk
+    created. With a GIN index, an exact or normalized exact match on any
+    attribute is an index lookup.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs["base_field"] = models.BigIntegerField()
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        del kwargs["base_field"]
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = lookup_hashes(
+            model_instance.domain_id, model_instance.attributes
+        )
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class NormalizedAttributesField(JSONField):
+    """
+    Normalized forms of an entity's string attributes, computed whenever the
+    entity is saved or bulk created, so fuzzy matching doesn't normalize
+    every candidate on every query.
+    """
+
+    def pre_save(self, model_instance, add):
+        value = normalized_attributes(model_instance.attributes)
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class BlockingKeysField(ArrayField):
+    """
+    Hashed keys of each blocking strategy for each of an entity's string
+    attributes, computed whenever the entity is saved or bulk created. With
+    a GIN index, finding the candidates that share a key with a query is an
+    index lookup.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs["base_field"] = models.BigIntegerField()
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        del kwargs["base_field"]
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = blocking_keys(normalized_attributes(model_instance.attributes))
+        setattr(model_instance, self.attname, value)
+        return value
@@ -0,0 +1,149 @@
+import codecs
+import csv
+import json
+import uuid
+
+from crosswalk.exceptions import NestedAttributesError, ReservedKeyError
+from crosswalk.models import Entity
+from crosswalk.validators import (
+    validate_no_reserved_keys,
+    validate_shallow_dict,
+)
+from django.db import DataError, IntegrityError, transaction
+
+
+class RowError(Exception):
+    pass
+
+
+def parse_ndjson(lines):
+    """
+    Parse newline-delimited JSON objects, yielding (line, row) tuples.
+    Blank lines are skipped. Rows that can't be parsed are yielded as a
+    RowError.
+    """
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, RowError("Invalid JSON.")
+            continue
+        if not isinstance(row, dict):
+            yield line_number, RowError("Row must be a JSON object.")
+            continue
+        yield line_number, row
+
+
+def parse_csv(lines):
+    """
+    Parse CSV with a header row, yielding (line, row) tuples. Empty cells
+    are left out of a row's attributes.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        if None in row:
+            yield reader.line_num, RowError("Row has too many cells.")
+            continue
+        yield reader.line_num, {
+            key: value for key, value in row.items() if value not in ("", None)
+        }
+
+
+def parse_rows(stream, format="ndjson", encoding="utf-8"):
+    """Parse rows from a binary stream, read one line at a time."""
+    lines = codecs.iterdecode(stream, encoding)
+    if format == "csv":
+        return parse_csv(lines)
+    return parse_ndjson(lines)
+
+
+def build_entity(domain, row, user=None):
+    """Validate a parsed row and build an unsaved entity from it."""
+    row = dict(row)
+    pk = row.pop("uuid", None)
+    try:
+        validate_shallow_dict(row)
+    except NestedAttributesError:
+        raise RowError("Cannot create entity with nested attributes.")
+    try:
+        validate_no_reserved_keys(row)
+    except ReservedKeyError:
+        raise RowError("Reserved key found in entity attributes.")
+    if not row:
+        raise RowError("Row has no attributes.")
+    entity = Entity(domain=domain, attributes=row, created_by=user)
+    if pk is not None:
+        try:
+            entity.uuid = uuid.UUID(str(pk))
+        except ValueError:
+            raise RowError("Invalid UUID.")
+    return entity
+
+
+def insert_entities(entities, copy=False):
+    """
+    Insert a chunk of entities in one statement. If any entity conflicts
+    with an existing one, insert them one at a time instead, so only the
+    conflicting entities fail.
+
+    Returns a list of (entity, error) tuples in the same order as
+    entities, where error is None for entities that were created.
+    """
+    insert = Entity.objects.copy_create if copy else Entity.objects.bulk_create
+    try:
+        with transaction.atomic():
+            insert(entities)
+        return [(entity, None) for entity in entities]
+    except (DataError, IntegrityError):
+        pass
+
+    results = []
+    for entity in entities:
+        try:
+            with transaction.atomic():
+                Entity.objects.bulk_create([entity])
+            results.append((entity, None))
+        except IntegrityError:
+            results.append(
+                (entity, "Entity with these attributes or UUID exists.")
+            )
+        except DataError:
+            results.append((entity, "Invalid entity."))
+    return results
+
+
+def import_entities(domain, rows, user=None, chunk_size=5000, copy=False):
+    """
+    Create entities in a domain from (line, row) tuples, inserting them in
+    chunks so rows can be consumed from a stream of any length.
+
+    Rows that fail validation or conflict with an existing entity are
+    skipped and reported rather than aborting the import. Returns the
+    number of entities created and a list of errors.
+    """
+    created, errors, chunk = 0, [], []
+
+    def flush():
+        nonlocal created
+        results = insert_entities([entity for _, entity in chunk], copy)
+        for (line, _), (_, error) in zip(chunk, results):
+            if error is None:
+                created += 1
+            else:
+                errors.append({"line": line, "error": error})
+        chunk.clear()
+
+    for line, row in rows:
+        try:
+            if isinstance(row, RowError):
+                raise row
+            chunk.append((line, build_entity(domain, row, user)))
+        except RowError as e:
+            errors.append({"line": line, "error": str(e)})
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return created, errors
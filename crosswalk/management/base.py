@@ -0,0 +1,86 @@
+import gzip
+
+from crosswalk.models import Domain, Entity
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class AttributeIndexCommand(BaseCommand):
+    """
+    Base command to create or drop an expression index on an entity
+    attribute, optionally limited to one domain with a partial index.
+
+    Subclasses set the index name suffix and the index definition, which is
+    formatted with the quoted table name and receives the attribute name as
+    a query parameter.
+    """
+
+    suffix = None
+    definition = None
+
+    def add_arguments(self, parser):
+        parser.add_argument("query_field", help="Attribute to index.")
+        parser.add_argument(
+            "--domain", help="Only index entities in this domain's slug."
+        )
+        parser.add_argument(
+            "--drop", action="store_true", help="Drop the index instead."
+        )
+
+    def setup(self, cursor):
+        """Hook to run SQL the index depends on before creating it."""
+        pass
+
+    def handle(self, *args, **options):
+        query_field = options["query_field"]
+        table = Entity._meta.db_table
+        where = ""
+        name = "{}_{}_{}".format(table, query_field, self.suffix)
+
+        if options["domain"]:
+            try:
+                domain = Domain.objects.get(slug=options["domain"])
+            except ObjectDoesNotExist:
+                raise CommandError("Domain not found.")
+            where = " WHERE domain_id = {:d}".format(domain.pk)
+            name = "{}_{}_{}_{}".format(
+                table, domain.pk, query_field, self.suffix
+            )
+
+        name = connection.ops.quote_name(name[:63])
+
+        with connection.cursor() as cursor:
+            if options["drop"]:
+                cursor.execute(
+                    "DROP INDEX CONCURRENTLY IF EXISTS {}".format(name)
+                )
+                self.stdout.write("Dropped index {}.".format(name))
+                return
+            self.setup(cursor)
+            cursor.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS {} ON {}{}".format(
+                    name,
+                    self.definition.format(
+                        table=connection.ops.quote_name(table)
+                    ),
+                    where,
+                ),
+                [query_field],
+            )
+        self.stdout.write("Created index {}.".format(name))
+
+
+def dump_format(path, format=None):
+    """Infer a dump's format, ndjson or csv, from its file name."""
+    if format:
+        return format
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.endswith(".csv") else "ndjson"
+
+
+def open_dump(path, mode):
+    """Open a dump file, compressed with gzip if its name ends in .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    return open(path, mode)
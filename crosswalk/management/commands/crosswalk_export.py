@@ -0,0 +1,83 @@
+from crosswalk.management.base import dump_format, open_dump
+from crosswalk.models import Domain, Entity
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# Control characters never appear unescaped in JSON, so using them as the
+# CSV quote and delimiter has COPY write each JSON object verbatim.
+NDJSON_QUERY = """
+COPY (
+    SELECT json_build_object(
+        'uuid', e.uuid,
+        'domain', d.slug,
+        'attributes', e.attributes,
+        'alias_for', e.alias_for_id,
+        'superseded_by', e.superseded_by_id
+    )
+    FROM {entity} e JOIN {domain} d ON d.id = e.domain_id
+    WHERE e.domain_id = ANY(%s)
+    ORDER BY e.domain_id, e.uuid
+) TO STDOUT WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')
+"""
+
+CSV_QUERY = """
+COPY (
+    SELECT e.uuid, d.slug AS domain, e.attributes,
+        e.alias_for_id AS alias_for, e.superseded_by_id AS superseded_by
+    FROM {entity} e JOIN {domain} d ON d.id = e.domain_id
+    WHERE e.domain_id = ANY(%s)
+    ORDER BY e.domain_id, e.uuid
+) TO STDOUT WITH (FORMAT csv, HEADER)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the entities in one or more domains, including aliases and "
+        "supersessions, to a newline-delimited JSON or CSV file streamed "
+        "from the database with COPY."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="File to write. Names ending in .gz are compressed with "
+            "gzip.",
+        )
+        parser.add_argument(
+            "domains",
+            nargs="*",
+            help="Slugs of the domains to export. Defaults to all domains.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=("ndjson", "csv"),
+            help="Defaults to csv for .csv and .csv.gz files, otherwise "
+            "ndjson.",
+        )
+
+    def handle(self, *args, **options):
+        domains = Domain.objects.all()
+        if options["domains"]:
+            domains = domains.filter(slug__in=options["domains"])
+            missing = set(options["domains"]) - {d.slug for d in domains}
+            if missing:
+                raise CommandError(
+                    "Domains not found: {}.".format(", ".join(sorted(missing)))
+                )
+        query = (
+            CSV_QUERY
+            if dump_format(options["path"], options["format"]) == "csv"
+            else NDJSON_QUERY
+        ).format(
+            entity=connection.ops.quote_name(Entity._meta.db_table),
+            domain=connection.ops.quote_name(Domain._meta.db_table),
+        )
+
+        with connection.cursor() as cursor, open_dump(
+            options["path"], "wb"
+        ) as dump:
+            query = cursor.mogrify(query, [[d.pk for d in domains]])
+            cursor.copy_expert(query.decode(), dump)
+            count = cursor.rowcount
+        self.stdout.write("Exported {} entities.".format(count))
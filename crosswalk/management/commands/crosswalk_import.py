@@ -0,0 +1,264 @@
+import csv
+import io
+import json
+import re
+import uuid
+
+from crosswalk.fields import (
+    attributes_hash,
+    blocking_keys,
+    lookup_hashes,
+    normalized_attributes,
+)
+from crosswalk.management.base import dump_format, open_dump
+from crosswalk.models import Domain, Entity
+from crosswalk.validators import full_validation
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DataError, IntegrityError, connection, transaction
+
+STAGE_TABLE = "crosswalk_import_stage"
+
+CREATE_STAGE = """
+CREATE TEMPORARY TABLE {stage} (
+    line integer,
+    uuid uuid,
+    domain_id integer,
+    attributes jsonb,
+    attributes_hash uuid,
+    lookup_hashes bigint[],
+    normalized jsonb,
+    blocking_keys bigint[],
+    alias_for_id uuid,
+    superseded_by_id uuid
+) ON COMMIT DROP
+"""
+
+INSERT_ENTITIES = """
+INSERT INTO {entity} (
+    uuid, domain_id, attributes, attributes_hash, lookup_hashes,
+    normalized, blocking_keys, created, updated
+)
+SELECT uuid, domain_id, attributes, attributes_hash, lookup_hashes,
+    normalized, blocking_keys, now(), now()
+FROM {stage}
+{on_conflict}
+"""
+
+# References to entities that weren't imported and don't exist are dropped.
+# Entities that already existed keep their own references.
+LINK_ENTITIES = """
+UPDATE {entity} e
+SET alias_for_id = (
+        SELECT uuid FROM {entity} WHERE uuid = s.alias_for_id
+    ),
+    superseded_by_id = (
+        SELECT uuid FROM {entity} WHERE uuid = s.superseded_by_id
+    )
+FROM {stage} s
+WHERE e.uuid = s.uuid
+AND e.domain_id = s.domain_id
+AND e.alias_for_id IS NULL
+AND e.superseded_by_id IS NULL
+AND (s.alias_for_id IS NOT NULL OR s.superseded_by_id IS NOT NULL)
+AND s.alias_for_id IS DISTINCT FROM e.uuid
+"""
+
+# The first staged entity whose UUID or attributes already exist, either in
+# the database or earlier in the file.
+FIND_CONFLICT = """
+SELECT min(line) FROM (
+    SELECT *,
+        row_number() OVER (PARTITION BY uuid ORDER BY line) AS uuid_rank,
+        row_number() OVER (
+            PARTITION BY domain_id, attributes_hash ORDER BY line
+        ) AS hash_rank
+    FROM {stage}
+) s
+WHERE uuid_rank > 1
+OR hash_rank > 1
+OR EXISTS (SELECT 1 FROM {entity} WHERE uuid = s.uuid)
+OR EXISTS (
+    SELECT 1 FROM {entity}
+    WHERE domain_id = s.domain_id AND attributes_hash = s.attributes_hash
+)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Import entities from a file written by crosswalk_export. Entities "
+        "are streamed into the database with COPY and inserted in a single "
+        "transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="File to read. Names ending in .gz are decompressed with "
+            "gzip.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=("ndjson", "csv"),
+            help="Defaults to csv for .csv and .csv.gz files, otherwise "
+            "ndjson.",
+        )
+        parser.add_argument(
+            "--skip-existing",
+            action="store_true",
+            help="Skip entities whose UUID or attributes already exist "
+            "instead of failing.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10000,
+            help="Number of entities copied to the database at a time.",
+        )
+
+    def handle(self, *args, **options):
+        domains = {domain.slug: domain.pk for domain in Domain.objects.all()}
+        tables = {
+            "entity": connection.ops.quote_name(Entity._meta.db_table),
+            "stage": STAGE_TABLE,
+        }
+        on_conflict = (
+            "ON CONFLICT DO NOTHING" if options["skip_existing"] else ""
+        )
+
+        with transaction.atomic(), connection.cursor() as cursor, open_dump(
+            options["path"], "rb"
+        ) as dump:
+            cursor.execute(CREATE_STAGE.format(**tables))
+            rows = self.read(
+                io.TextIOWrapper(dump, encoding="utf-8", newline=""),
+                dump_format(options["path"], options["format"]),
+            )
+            staged, imported, lines = 0, set(), []
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for line, row in rows:
+                if (
+                    not isinstance(row, dict)
+                    or not row.get("uuid")
+                    or not isinstance(row.get("attributes"), dict)
+                ):
+                    raise CommandError("Line {}: invalid entity.".format(line))
+                try:
+                    domain_id = domains[row.get("domain")]
+                except KeyError:
+                    raise CommandError(
+                        "Line {}: domain {} not found.".format(
+                            line, row.get("domain")
+                        )
+                    )
+                try:
+                    for field in ("uuid", "alias_for", "superseded_by"):
+                        if row.get(field):
+                            uuid.UUID(str(row[field]))
+                except ValueError:
+                    raise CommandError(
+                        "Line {}: invalid {} UUID.".format(line, field)
+                    )
+                try:
+                    full_validation(row["attributes"])
+                except ValidationError as e:
+                    raise CommandError(
+                        "Line {}: {}".format(line, e.messages[0])
+                    )
+                hashes = lookup_hashes(domain_id, row["attributes"])
+                normalized = normalized_attributes(row["attributes"])
+                keys = blocking_keys(normalized)
+                writer.writerow(
+                    [
+                        line,
+                        row["uuid"],
+                        domain_id,
+                        json.dumps(row["attributes"]),
+                        attributes_hash(row["attributes"]),
+                        "{%s}" % ",".join(str(h) for h in hashes),
+                        json.dumps(normalized),
+                        "{%s}" % ",".join(str(k) for k in keys),
+                        row.get("alias_for"),
+                        row.get("superseded_by"),
+                    ]
+                )
+                lines.append(line)
+                imported.add(domain_id)
+                staged += 1
+                if staged % options["chunk_size"] == 0:
+                    self.copy(cursor, buffer, lines)
+            self.copy(cursor, buffer, lines)
+
+            try:
+                with transaction.atomic():
+                    cursor.execute(
+                        INSERT_ENTITIES.format(
+                            on_conflict=on_conflict, **tables
+                        )
+                    )
+            except IntegrityError:
+                cursor.execute(FIND_CONFLICT.format(**tables))
+                raise CommandError(
+                    "Line {}: entity's UUID or attributes already "
+                    "exist.".format(cursor.fetchone()[0])
+                )
+            created = cursor.rowcount
+            cursor.execute(LINK_ENTITIES.format(**tables))
+            for domain in Domain.objects.filter(pk__in=imported):
+                Entity.objects.rebuild_canonicals(domain)
+
+        self.stdout.write(
+            "Imported {} of {} entities.".format(created, staged)
+        )
+
+    def copy(self, cursor, buffer, lines):
+        """Copy buffered entities, read from lines, to the stage table."""
+        buffer.seek(0)
+        # copy_expert is called on the psycopg2 cursor, so wrap its errors
+        # in Django's to catch DataError.
+        try:
+            with connection.wrap_database_errors:
+                cursor.copy_expert(
+                    "COPY {} FROM STDIN WITH (FORMAT csv)".format(STAGE_TABLE),
+                    buffer,
+                )
+        except DataError as e:
+            # The error's context names the row of this copy that failed.
+            diag = getattr(e.__cause__, "diag", None)
+            row = re.search(r"line (\d+)", getattr(diag, "context", "") or "")
+            if row and int(row.group(1)) <= len(lines):
+                line = lines[int(row.group(1)) - 1]
+            else:
+                line = "{}-{}".format(lines[0], lines[-1])
+            raise CommandError(
+                "Line {}: {}".format(line, str(e).splitlines()[0])
+            )
+        buffer.seek(0)
+        buffer.truncate()
+        del lines[:]
+
+    def read(self, lines, format):
+        """Yield (line, row) tuples from an export."""
+        if format == "csv":
+            reader = csv.DictReader(lines)
+            for row in reader:
+                try:
+                    row["attributes"] = json.loads(row["attributes"])
+                except (KeyError, TypeError, ValueError):
+                    raise CommandError(
+                        "Line {}: invalid attributes.".format(reader.line_num)
+                    )
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                raise CommandError(
+                    "Line {}: invalid JSON.".format(line_number)
+                )
+            yield line_number, row
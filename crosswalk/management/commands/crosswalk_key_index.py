@@ -0,0 +1,10 @@
+from crosswalk.management.base import AttributeIndexCommand
+
+
+class Command(AttributeIndexCommand):
+    help = (
+        "Create a B-tree index on an entity attribute to speed up exact "
+        "matches on it."
+    )
+    suffix = "key"
+    definition = "{table} ((attributes -> %s))"
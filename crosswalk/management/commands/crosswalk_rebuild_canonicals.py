@@ -0,0 +1,22 @@
+from crosswalk.models import Domain, Entity
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Recompute the canonical entity stored on every alias."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--domain", help="Only rebuild entities in this domain's slug."
+        )
+
+    def handle(self, *args, **options):
+        domain = None
+        if options["domain"]:
+            try:
+                domain = Domain.objects.get(slug=options["domain"])
+            except ObjectDoesNotExist:
+                raise CommandError("Domain not found.")
+        updated = Entity.objects.rebuild_canonicals(domain)
+        self.stdout.write("Updated {} entities.".format(updated))
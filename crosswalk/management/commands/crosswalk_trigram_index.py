@@ -0,0 +1,13 @@
+from crosswalk.management.base import AttributeIndexCommand
+
+
+class Command(AttributeIndexCommand):
+    help = (
+        "Create a GIN trigram index on an entity attribute to speed up "
+        "CROSSWALK_TRIGRAM_PREFILTER queries."
+    )
+    suffix = "trgm"
+    definition = "{table} USING gin ((attributes ->> %s) gin_trgm_ops)"
+
+    def setup(self, cursor):
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
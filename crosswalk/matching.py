@@ -0,0 +1,361 @@
+import json
+
+from crosswalk.candidates import (
+    blocked_candidates,
+    candidate_index,
+    trigram_candidates,
+)
+from crosswalk.fields import normalize
+from crosswalk.metrics import count
+from crosswalk.models import Entity
+from crosswalk.scorers import (
+    extract_many,
+    extract_one,
+    extract_top,
+    prepare,
+)
+from django.conf import settings
+
+
+def top_options(data):
+    """
+    Read and validate the limit and score_cutoff of a best match request,
+    raising ValueError with a message for the client if either is invalid.
+    """
+    limit = data.get("limit")
+    score_cutoff = data.get("score_cutoff")
+    max_limit = getattr(settings, "CROSSWALK_MAX_MATCH_LIMIT", 100)
+    if limit is not None and (
+        isinstance(limit, bool)
+        or not isinstance(limit, int)
+        or not 0 < limit <= max_limit
+    ):
+        raise ValueError("limit must be between 1 and {}.".format(max_limit))
+    if score_cutoff is not None and (
+        isinstance(score_cutoff, bool)
+        or not isinstance(score_cutoff, (int, float))
+    ):
+        raise ValueError("score_cutoff must be a number.")
+    return limit, score_cutoff
+
+
+def threshold_option(data):
+    """
+    Read and validate the threshold of a match or create request, raising
+    ValueError with a message for the client if it's missing or invalid.
+    """
+    threshold = data.get("threshold")
+    if isinstance(threshold, bool) or not isinstance(threshold, (int, float)):
+        raise ValueError("threshold must be a number.")
+    return threshold
+
+
+def blocking_levels(domain, fallback=False):
+    """
+    Return the lists of blocking strategies to try for a fuzzy match in a
+    domain, narrowest first.
+
+    Without fallback, only the domain's strategies are used. With it, its
+    strategies are dropped one at a time from the end of the list and,
+    last, the whole block is searched.
+    """
+    if not domain.blocking:
+        return [[]]
+    if not fallback:
+        return [domain.blocking]
+    return [
+        domain.blocking[:n] for n in range(len(domain.blocking), 0, -1)
+    ] + [[]]
+
+
+def load_candidates(domain, query_field, query_value, block_attrs, blocking):
+    """
+    Load the candidates for a query that share keys under a list of
+    blocking strategies, the trigram prefiltered candidates if
+    CROSSWALK_TRIGRAM_PREFILTER is set, or else the cached block.
+    """
+    prefilter = getattr(settings, "CROSSWALK_TRIGRAM_PREFILTER", None)
+    if blocking:
+        return blocked_candidates(
+            domain, query_field, query_value, block_attrs, blocking
+        )
+    if prefilter:
+        return trigram_candidates(
+            domain, query_field, query_value, block_attrs, prefilter
+        )
+    return candidate_index.get(domain, query_field, block_attrs)
+
+
+def scoring_values(scorer, query_value, candidates):
+    """
+    Return the scorer and values to score a query with, and the position
+    among the candidates of each value.
+
+    If CROSSWALK_TOKEN_INDEX is set, scorers with a ``token_based``
+    attribute only score the candidates sharing tokens with the query, as
+    found by the candidates' token index. Every candidate is scored if none
+    do.
+    """
+    block_scorer, block_values = prepare(scorer, candidates)
+    positions = None
+    if getattr(settings, "CROSSWALK_TOKEN_INDEX", False) and getattr(
+        scorer, "token_based", False
+    ):
+        positions = candidates.tokens.sharing(
+            normalize(query_value).split(),
+            getattr(settings, "CROSSWALK_TOKEN_INDEX_MIN_SHARE", 0),
+            getattr(settings, "CROSSWALK_TOKEN_INDEX_MAX_FREQUENCY", 0.05),
+        )
+    if positions is None:
+        positions = range(len(block_values))
+    else:
+        block_values = [block_values[position] for position in positions]
+    count("candidates", len(block_values))
+    return block_scorer, block_values, positions
+
+
+def best_match(
+    domain,
+    query_field,
+    query_value,
+    block_attrs,
+    scorer,
+    threshold=None,
+    fallback=False,
+):
+    """
+    Score a query against the cached candidates of a domain block.
+
+    If the domain has blocking strategies, only candidates sharing a key
+    with the query under each of them are scored. With fallback, wider
+    blocks are searched until a match scores at least threshold, or any
+    candidate is found if threshold is None. Otherwise, if
+    CROSSWALK_TRIGRAM_PREFILTER is set, only that many candidates most
+    similar to the query by pg_trgm similarity are loaded from the database
+    and scored instead.
+
+    Returns a tuple of the best matched entity, the matched value and the
+    match score, or (None, None, None) if the block has no candidates.
+    """
+    for blocking in blocking_levels(domain, fallback):
+        entity, match, score = _best_match(
+            domain, query_field, query_value, block_attrs, scorer, blocking
+        )
+        if entity is not None and (threshold is None or score >= threshold):
+            break
+    return entity, match, score
+
+
+def _best_match(
+    domain, query_field, query_value, block_attrs, scorer, blocking
+):
+    for attempt in range(2):
+        candidates = load_candidates(
+            domain, query_field, query_value, block_attrs, blocking
+        )
+        if not candidates.uuids:
+            break
+        block_scorer, block_values, positions = scoring_values(
+            scorer, query_value, candidates
+        )
+        index, score = extract_one(block_scorer, query_value, block_values)
+        index = positions[index]
+        entity = (
+            Entity.objects.select_related("canonical")
+            .filter(pk=candidates.uuids[index])
+            .first()
+        )
+        if entity is not None:
+            return entity, candidates.values[index], score
+        # Deleted by another process since the block was built.
+        candidate_index.invalidate(domain)
+    return None, None, None
+
+
+def top_matches(
+    domain,
+    query_field,
+    query_value,
+    block_attrs,
+    scorer,
+    limit,
+    score_cutoff=None,
+    fallback=False,
+):
+    """
+    Score a query against the cached candidates of a domain block and keep
+    up to limit of the best, leaving out those scoring below score_cutoff.
+
+    Candidates are blocked and prefiltered as in best_match, and with
+    fallback, wider blocks are searched until a match scores at least
+    score_cutoff. Returns a list of (entity, match, score) tuples, best
+    first.
+    """
+    for blocking in blocking_levels(domain, fallback):
+        matches = _top_matches(
+            domain,
+            query_field,
+            query_value,
+            block_attrs,
+            scorer,
+            limit,
+            score_cutoff,
+            blocking,
+        )
+        if matches:
+            break
+    return matches
+
+
+def _top_matches(
+    domain,
+    query_field,
+    query_value,
+    block_attrs,
+    scorer,
+    limit,
+    score_cutoff,
+    blocking,
+):
+    for attempt in range(2):
+        candidates = load_candidates(
+            domain, query_field, query_value, block_attrs, blocking
+        )
+        if not candidates.uuids:
+            return []
+        block_scorer, block_values, positions = scoring_values(
+            scorer, query_value, candidates
+        )
+        ranked = [
+            (positions[index], score)
+            for index, score in extract_top(
+                block_scorer, query_value, block_values, limit, score_cutoff
+            )
+        ]
+        uuids = [candidates.uuids[index] for index, _ in ranked]
+        entities = Entity.objects.select_related("canonical").in_bulk(uuids)
+        if len(entities) == len(set(uuids)) or attempt:
+            break
+        # Deleted by another process since the block was built.
+        candidate_index.invalidate(domain)
+
+    return [
+        (entities[candidates.uuids[index]], candidates.values[index], score)
+        for index, score in ranked
+        if candidates.uuids[index] in entities
+    ]
+
+
+def _group_queries(queries):
+    # Positions of queries sharing a query field and block, with the block.
+    groups = {}
+    for position, query in enumerate(queries):
+        block_attrs = query.get("block_attrs", {})
+        key = (query["query_field"], json.dumps(block_attrs, sort_keys=True))
+        groups.setdefault(key, (block_attrs, []))[1].append(position)
+    return groups
+
+
+def best_matches(domain, queries, scorer, score_cutoff=None):
+    """
+    Score many queries against the cached candidates of a domain.
+
+    Queries are dicts with query_field, query_value and optional block_attrs.
+    Queries sharing a query field and block are scored together against
+    candidates loaded once. Returns a list of (entity, match, score) tuples
+    in the same order as queries, (None, None, None) where a block has no
+    candidates or no candidate scores at least score_cutoff.
+
+    Domains' blocking strategies and the token index aren't applied, since
+    queries sharing a block have different keys and tokens.
+    """
+    groups = _group_queries(queries)
+    for attempt in range(2):
+        winners = [None] * len(queries)
+        for (query_field, _), (block_attrs, positions) in groups.items():
+            candidates = candidate_index.get(domain, query_field, block_attrs)
+            count("candidates", len(candidates.uuids))
+            if not candidates.uuids:
+                continue
+            query_values = [queries[p]["query_value"] for p in positions]
+            block_scorer, block_values = prepare(scorer, candidates)
+            results = extract_many(
+                block_scorer, query_values, block_values, score_cutoff
+            )
+            for position, result in zip(positions, results):
+                if result is None:
+                    continue
+                index, score = result
+                winners[position] = (
+                    candidates.uuids[index],
+                    candidates.values[index],
+                    score,
+                )
+
+        entities = Entity.objects.select_related("canonical").in_bulk(
+            [winner[0] for winner in winners if winner is not None]
+        )
+        if all(w is None or w[0] in entities for w in winners):
+            break
+        # Deleted by another process since the block was built.
+        candidate_index.invalidate(domain)
+
+    return [
+        (entities.get(winner[0]), winner[1], winner[2])
+        if winner is not None and winner[0] in entities
+        else (None, None, None)
+        for winner in winners
+    ]
+
+
+def batch_top_matches(domain, queries, scorer, limit, score_cutoff=None):
+    """
+    Score many queries against the cached candidates of a domain and keep
+    up to limit of the best for each, leaving out those scoring below
+    score_cutoff.
+
+    Candidates are loaded once for queries sharing a query field and block,
+    and every matched entity is fetched in a single query, as in
+    best_matches. Returns a list of lists of (entity, match, score) tuples,
+    best first, in the same order as queries.
+    """
+    groups = _group_queries(queries)
+    for attempt in range(2):
+        ranked = [[] for query in queries]
+        for (query_field, _), (block_attrs, positions) in groups.items():
+            candidates = candidate_index.get(domain, query_field, block_attrs)
+            count("candidates", len(candidates.uuids))
+            if not candidates.uuids:
+                continue
+            block_scorer, block_values = prepare(scorer, candidates)
+            for position in positions:
+                ranked[position] = [
+                    (
+                        candidates.uuids[index],
+                        candidates.values[index],
+                        score,
+                    )
+                    for index, score in extract_top(
+                        block_scorer,
+                        queries[position]["query_value"],
+                        block_values,
+                        limit,
+                        score_cutoff,
+                    )
+                ]
+
+        uuids = {uuid for matches in ranked for uuid, _, _ in matches}
+        entities = Entity.objects.select_related("canonical").in_bulk(uuids)
+        if len(entities) == len(uuids) or attempt:
+            break
+        # Deleted by another process since the block was built.
+        candidate_index.invalidate(domain)
+
+    return [
+        [
+            (entities[uuid], match, score)
+            for uuid, match, score in matches
+            if uuid in entities
+        ]
+        for matches in ranked
+    ]
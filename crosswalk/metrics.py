@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from crosswalk.models import Domain
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
+
+_local = threading.local()
+
+
+class RequestMetrics(object):
+    """
+    Timings and counts collected while handling one request.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.scorers = defaultdict(float)
+
+    def __call__(self, execute, sql, params, many, context):
+        """Time a database query, as a connection execute wrapper."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds["db"] += time.perf_counter() - start
+            self.counts["db_queries"] += 1
+
+    def server_timing(self):
+        """Format the metrics as a Server-Timing header value."""
+        total = time.perf_counter() - self.started
+        return ", ".join(
+            [
+                'db;dur={:.1f};desc="{} queries"'.format(
+                    self.seconds["db"] * 1000, self.counts["db_queries"]
+                ),
+                "score;dur={:.1f}".format(self.seconds["score"] * 1000),
+                "serialize;dur={:.1f}".format(
+                    self.seconds["serialize"] * 1000
+                ),
+                'candidates;desc="{}"'.format(self.counts["candidates"]),
+                "total;dur={:.1f}".format(total * 1000),
+            ]
+        )
+
+
+def enabled():
+    return getattr(settings, "CROSSWALK_METRICS", False)
+
+
+def current():
+    """Return the metrics of the request being handled, if any."""
+    return getattr(_local, "metrics", None)
+
+
+@contextmanager
+def collect():
+    """Collect metrics for the code run inside the block."""
+    metrics = _local.metrics = RequestMetrics()
+    try:
+        with connection.execute_wrapper(metrics):
+            yield metrics
+    finally:
+        _local.metrics = None
+
+
+@contextmanager
+def timer(name, scorer=None):
+    """Add the time spent inside the block to the current request."""
+    metrics = current()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.seconds[name] += elapsed
+        if scorer is not None:
+            metrics.scorers[scorer] += elapsed
+
+
+def count(name, value=1):
+    """Add to a count of the current request."""
+    metrics = current()
+    if metrics is not None:
+        metrics.counts[name] += value
+
+
+def domain_label(slug):
+    """
+    Return a requested domain's slug as a metric label, or "unknown" if no
+    such domain exists, so requests for made-up slugs can't add series.
+    """
+    if slug is None:
+        return ""
+    try:
+        Domain.objects.get_cached(slug=slug)
+    except ObjectDoesNotExist:
+        return "unknown"
+    return slug
+
+
+def scorer_name(scorer):
+    return "{}.{}".format(scorer.__module__.split(".")[-1], scorer.__name__)
+
+
+class MetricsRegistry(object):
+    """
+    Per-process totals of request metrics by view, domain, method and
+    status, and of scoring time by scorer and domain.
+    """
+
+    def __init__(self):
+        self._requests = defaultdict(lambda: defaultdict(float))
+        self._scorers = defaultdict(lambda: defaultdict(float))
+        self._lock = threading.Lock()
+
+    def observe(self, view, domain, method, status, metrics):
+        labels = (
+            ("view", view),
+            ("domain", domain),
+            ("method", method),
+            ("status", str(status)),
+        )
+        elapsed = time.perf_counter() - metrics.started
+        with self._lock:
+            totals = self._requests[labels]
+            totals["requests_total"] += 1
+            totals["request_seconds_total"] += elapsed
+            totals["db_queries_total"] += metrics.counts["db_queries"]
+            totals["candidates_total"] += metrics.counts["candidates"]
+            for name in ("db", "score", "serialize"):
+                totals[name + "_seconds_total"] += metrics.seconds[name]
+            for scorer, seconds in metrics.scorers.items():
+                scorer_totals = self._scorers[
+                    (("scorer", scorer), ("domain", domain))
+                ]
+                scorer_totals["scorer_requests_total"] += 1
+                scorer_totals["scorer_seconds_total"] += seconds
+
+    def clear(self):
+        with self._lock:
+            self._requests.clear()
+            self._scorers.clear()
+
+    def render(self, gauges=None):
+        """Render the totals in the Prometheus text exposition format."""
+        samples = defaultdict(list)
+        with self._lock:
+            for series in (self._requests, self._scorers):
+                for labels, totals in series.items():
+                    for name, value in totals.items():
+                        samples[name].append((labels, value))
+        for name, value in (gauges or {}).items():
+            samples[name].append(((), value))
+
+        lines = []
+        for name in sorted(samples):
+            metric = "crosswalk_" + name
+            lines.append(
+                "# TYPE {} {}".format(
+                    metric, "counter" if name.endswith("_total") else "gauge"
+                )
+            )
+            for labels, value in samples[name]:
+                label_text = ",".join(
+                    '{}="{}"'.format(
+                        key, label.replace("\\", "\\\\").replace('"', '\\"')
+                    )
+                    for key, label in labels
+                )
+                lines.append(
+                    "{}{} {}".format(
+                        metric,
+                        "{%s}" % label_text if label_text else "",
+                        repr(float(value)),
+                    )
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class InstrumentedViewMixin(object):
+    """
+    Record the database queries, database time, scoring time,
+    serialization time and candidates scored of each request when
+    CROSSWALK_METRICS is set, returning them in a Server-Timing header and
+    adding them to the process' metrics registry.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not enabled():
+            return super().dispatch(request, *args, **kwargs)
+        with collect() as metrics:
+            response = super().dispatch(request, *args, **kwargs)
+            # Render here so encoding the response counts as serialization.
+            if hasattr(response, "render") and not response.is_rendered:
+                with timer("serialize"):
+                    response.render()
+        response["Server-Timing"] = metrics.server_timing()
+        registry.observe(
+            type(self).__name__,
+            domain_label(kwargs.get("domain")),
+            request.method,
+            response.status_code,
+            metrics,
+        )
+        return response
@@ -0,0 +1,24 @@
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0002_auto_20190409_0153")]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="entity",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["attributes"],
+                name="crosswalk_attributes_gin",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="entity",
+            index=models.Index(
+                fields=["domain", "alias_for"], name="crosswalk_domain_alias"
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+import crosswalk.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0003_entity_indexes")]
+
+    operations = [
+        migrations.AddField(
+            model_name="entity",
+            name="attributes_hash",
+            field=crosswalk.fields.AttributesHashField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="entity",
+            name="lookup_hashes",
+            field=crosswalk.fields.LookupHashesField(
+                default=list, editable=False
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+import crosswalk.fields
+from django.db import migrations
+
+
+def populate_hashes(apps, schema_editor):
+    Entity = apps.get_model("crosswalk", "Entity")
+    batch = []
+    for entity in Entity.objects.only("uuid", "domain", "attributes").iterator(
+        chunk_size=2000
+    ):
+        entity.attributes_hash = crosswalk.fields.attributes_hash(
+            entity.attributes
+        )
+        entity.lookup_hashes = crosswalk.fields.lookup_hashes(
+            entity.domain_id, entity.attributes
+        )
+        batch.append(entity)
+        if len(batch) == 2000:
+            Entity.objects.bulk_update(
+                batch, ["attributes_hash", "lookup_hashes"]
+            )
+            batch = []
+    Entity.objects.bulk_update(batch, ["attributes_hash", "lookup_hashes"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0004_entity_hashes")]
+
+    operations = [
+        migrations.RunPython(populate_hashes, migrations.RunPython.noop)
+    ]
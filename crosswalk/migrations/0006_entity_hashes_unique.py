@@ -0,0 +1,25 @@
+import crosswalk.fields
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0005_populate_entity_hashes")]
+
+    operations = [
+        migrations.AlterField(
+            model_name="entity",
+            name="attributes_hash",
+            field=crosswalk.fields.AttributesHashField(editable=False),
+        ),
+        migrations.AlterUniqueTogether(
+            name="entity", unique_together={("domain", "attributes_hash")}
+        ),
+        migrations.AddIndex(
+            model_name="entity",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["lookup_hashes"], name="crosswalk_lookup_hashes_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0006_entity_hashes_unique")]
+
+    operations = [
+        migrations.AddField(
+            model_name="entity",
+            name="canonical",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text="Entity at the end of this entity's alias chain, "
+                "if it's an alias.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="crosswalk.Entity",
+            ),
+        )
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+POPULATE_CANONICAL = """
+WITH RECURSIVE chain(uuid, root, path) AS (
+    SELECT uuid, uuid, ARRAY[uuid]
+    FROM crosswalk_entity
+    WHERE alias_for_id IS NULL
+  UNION ALL
+    SELECT e.uuid, chain.root, chain.path || e.uuid
+    FROM chain
+    JOIN crosswalk_entity e ON e.alias_for_id = chain.uuid
+    WHERE NOT e.uuid = ANY(chain.path)
+)
+UPDATE crosswalk_entity e
+SET canonical_id = chain.root
+FROM chain
+WHERE e.uuid = chain.uuid AND chain.root != e.uuid
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0007_entity_canonical")]
+
+    operations = [
+        migrations.RunSQL(POPULATE_CANONICAL, migrations.RunSQL.noop)
+    ]
@@ -0,0 +1,17 @@
+import crosswalk.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0008_populate_entity_canonical")]
+
+    operations = [
+        migrations.AddField(
+            model_name="entity",
+            name="normalized",
+            field=crosswalk.fields.NormalizedAttributesField(
+                default=dict, editable=False
+            ),
+        )
+    ]
@@ -0,0 +1,27 @@
+import crosswalk.fields
+from django.db import migrations
+
+
+def populate_normalized(apps, schema_editor):
+    Entity = apps.get_model("crosswalk", "Entity")
+    batch = []
+    for entity in Entity.objects.only("uuid", "attributes").iterator(
+        chunk_size=2000
+    ):
+        entity.normalized = crosswalk.fields.normalized_attributes(
+            entity.attributes
+        )
+        batch.append(entity)
+        if len(batch) == 2000:
+            Entity.objects.bulk_update(batch, ["normalized"])
+            batch = []
+    Entity.objects.bulk_update(batch, ["normalized"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0009_entity_normalized")]
+
+    operations = [
+        migrations.RunPython(populate_normalized, migrations.RunPython.noop)
+    ]
@@ -0,0 +1,18 @@
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0010_populate_entity_normalized")]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="entity",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["normalized"],
+                name="crosswalk_normalized_gin",
+                opclasses=["jsonb_path_ops"],
+            ),
+        )
+    ]
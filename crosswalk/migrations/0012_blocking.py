@@ -0,0 +1,38 @@
+import crosswalk.fields
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0011_entity_normalized_index")]
+
+    operations = [
+        migrations.AddField(
+            model_name="domain",
+            name="blocking",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(
+                    choices=[
+                        ("first_letter", "first letter"),
+                        ("soundex", "soundex"),
+                        ("ngram", "ngram"),
+                        ("length_band", "length band"),
+                    ],
+                    max_length=20,
+                ),
+                blank=True,
+                default=list,
+                help_text="Blocking strategies whose keys fuzzy match "
+                "candidates must share with the query.",
+                size=None,
+            ),
+        ),
+        migrations.AddField(
+            model_name="entity",
+            name="blocking_keys",
+            field=crosswalk.fields.BlockingKeysField(
+                default=list, editable=False
+            ),
+        ),
+    ]
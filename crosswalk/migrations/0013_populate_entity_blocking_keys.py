@@ -0,0 +1,27 @@
+import crosswalk.fields
+from django.db import migrations
+
+
+def populate_blocking_keys(apps, schema_editor):
+    Entity = apps.get_model("crosswalk", "Entity")
+    batch = []
+    for entity in Entity.objects.only("uuid", "normalized").iterator(
+        chunk_size=2000
+    ):
+        entity.blocking_keys = crosswalk.fields.blocking_keys(
+            entity.normalized
+        )
+        batch.append(entity)
+        if len(batch) == 2000:
+            Entity.objects.bulk_update(batch, ["blocking_keys"])
+            batch = []
+    Entity.objects.bulk_update(batch, ["blocking_keys"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0012_blocking")]
+
+    operations = [
+        migrations.RunPython(populate_blocking_keys, migrations.RunPython.noop)
+    ]
@@ -0,0 +1,16 @@
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0013_populate_entity_blocking_keys")]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="entity",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["blocking_keys"], name="crosswalk_blocking_keys_gin"
+            ),
+        )
+    ]
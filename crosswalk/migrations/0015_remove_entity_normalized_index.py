@@ -0,0 +1,12 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0014_entity_blocking_keys_index")]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="entity", name="crosswalk_normalized_gin"
+        )
+    ]
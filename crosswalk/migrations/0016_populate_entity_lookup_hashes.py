@@ -0,0 +1,27 @@
+import crosswalk.fields
+from django.db import migrations
+
+
+def populate_lookup_hashes(apps, schema_editor):
+    Entity = apps.get_model("crosswalk", "Entity")
+    batch = []
+    for entity in Entity.objects.only("uuid", "domain", "attributes").iterator(
+        chunk_size=2000
+    ):
+        entity.lookup_hashes = crosswalk.fields.lookup_hashes(
+            entity.domain_id, entity.attributes
+        )
+        batch.append(entity)
+        if len(batch) == 2000:
+            Entity.objects.bulk_update(batch, ["lookup_hashes"])
+            batch = []
+    Entity.objects.bulk_update(batch, ["lookup_hashes"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0015_remove_entity_normalized_index")]
+
+    operations = [
+        migrations.RunPython(populate_lookup_hashes, migrations.RunPython.noop)
+    ]
@@ -0,0 +1,31 @@
+import crosswalk.fields
+from django.db import migrations
+
+
+def rehash_numbers(apps, schema_editor):
+    # Only entities with integral float attributes get new hashes.
+    Entity = apps.get_model("crosswalk", "Entity")
+    batch = []
+    for entity in Entity.objects.only(
+        "uuid", "domain", "attributes", "lookup_hashes"
+    ).iterator(chunk_size=2000):
+        hashes = crosswalk.fields.lookup_hashes(
+            entity.domain_id, entity.attributes
+        )
+        if hashes == entity.lookup_hashes:
+            continue
+        entity.lookup_hashes = hashes
+        batch.append(entity)
+        if len(batch) == 2000:
+            Entity.objects.bulk_update(batch, ["lookup_hashes"])
+            batch = []
+    Entity.objects.bulk_update(batch, ["lookup_hashes"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crosswalk", "0016_populate_entity_lookup_hashes")]
+
+    operations = [
+        migrations.RunPython(rehash_numbers, migrations.RunPython.noop)
+    ]
@@ -1,8 +1,83 @@
+import threading
+import time
+
+from crosswalk.blocking import STRATEGY_CHOICES
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
 from uuslug import uuslug
 
 
+class DomainCache(object):
+    """
+    Per-process cache of every domain by slug and primary key, with each
+    domain's parent resolved in memory.
+
+    The cache is cleared when a domain is saved or deleted in this process
+    and reloaded after CROSSWALK_DOMAIN_CACHE_TTL seconds to pick up changes
+    from other processes, or when a domain isn't found but exists in the
+    database.
+    """
+
+    def __init__(self):
+        self._by_slug = None
+        self._by_pk = None
+        self._loaded = None
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, "CROSSWALK_DOMAIN_CACHE_TTL", 60)
+
+    def get(self, slug=None, pk=None):
+        for reload in (False, True):
+            by_slug, by_pk = self._load(reload)
+            domain = by_slug.get(slug) if pk is None else by_pk.get(pk)
+            if domain is not None:
+                return domain
+            # Only reload every domain if the missing one has been created
+            # since, so requests for unknown domains cost one small query.
+            lookup = {"slug": slug} if pk is None else {"pk": pk}
+            if reload or not Domain.objects.filter(**lookup).exists():
+                break
+        raise Domain.DoesNotExist("Domain matching query does not exist.")
+
+    def clear(self):
+        with self._lock:
+            self._by_slug = self._by_pk = self._loaded = None
+
+    def _load(self, reload):
+        with self._lock:
+            expired = self._loaded is None or (
+                self.ttl is not None
+                and time.monotonic() - self._loaded > self.ttl
+            )
+            if reload or expired:
+                domains = list(Domain.objects.all())
+                self._by_pk = {domain.pk: domain for domain in domains}
+                self._by_slug = {domain.slug: domain for domain in domains}
+                parent_field = Domain._meta.get_field("parent")
+                for domain in domains:
+                    parent_field.set_cached_value(
+                        domain, self._by_pk.get(domain.parent_id)
+                    )
+                self._loaded = time.monotonic()
+            return self._by_slug, self._by_pk
+
+
+domain_cache = DomainCache()
+
+
+class DomainQuerySet(models.QuerySet):
+    def get_cached(self, slug=None, pk=None):
+        """
+        Get a domain by slug or primary key from the domain cache, raising
+        Domain.DoesNotExist if it doesn't exist.
+        """
+        return domain_cache.get(slug=slug, pk=pk)
+
+
 class Domain(models.Model):
     slug = models.SlugField(
         blank=True, max_length=250, unique=True, editable=False
@@ -18,12 +93,22 @@ class Domain(models.Model):
         on_delete=models.PROTECT,
     )
 
+    blocking = ArrayField(
+        models.CharField(max_length=20, choices=STRATEGY_CHOICES),
+        default=list,
+        blank=True,
+        help_text="Blocking strategies whose keys fuzzy match candidates "
+        "must share with the query.",
+    )
+
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(
         User, related_name="+", null=True, on_delete=models.SET_NULL
     )
 
+    objects = DomainQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = uuslug(
@@ -1,5 +1,17 @@
+import csv
+import io
+import json
 import uuid
 
+from crosswalk.fields import (
+    AttributesHashField,
+    BlockingKeysField,
+    LookupHashesField,
+    NormalizedAttributesField,
+    attributes_hash,
+    lookup_hash,
+    normalized_lookup_hash,
+)
 from crosswalk.models import Domain
 from crosswalk.validators import (
     validate_no_reserved_keys,
@@ -7,8 +19,311 @@ from crosswalk.validators import (
 )
 from django.contrib.auth.models import User
 from django.contrib.postgres.fields import JSONField
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.db import IntegrityError, connection, models
 from django.db.models import Q, F
+from django.utils import timezone
+
+# Fields computed from an entity's attributes when it's saved.
+DERIVED_FIELDS = (
+    "attributes_hash",
+    "lookup_hashes",
+    "normalized",
+    "blocking_keys",
+)
+
+
+class EntityQuerySet(models.QuerySet):
+    def exact(self, domain, field, value):
+        """
+        Filter to entities in a domain with an attribute equal to a value.
+
+        Uses the indexed lookup hashes, rechecking the attribute itself to
+        rule out hash collisions.
+        """
+        return self.filter(
+            domain=domain,
+            lookup_hashes__contains=[lookup_hash(domain.pk, field, value)],
+            **{"attributes__{}".format(field): value}
+        )
+
+    def unique(self):
+        """
+        Return the only entity in the queryset, or None if it's empty,
+        fetching at most two rows in a single query.
+
+        Raises Entity.MultipleObjectsReturned if there's more than one.
+        """
+        entities = list(self[:2])
+        if len(entities) > 1:
+            raise self.model.MultipleObjectsReturned(
+                "Found more than one entity."
+            )
+        return entities[0] if entities else None
+
+    def block_matches(self, domain, blocks, limit=2):
+        """
+        Find up to limit entities in a domain containing each of many sets
+        of block attributes, in one query.
+
+        Returns a list of lists of entities in the same order as blocks.
+        The default limit of two is enough to tell whether a block matches
+        no entity, exactly one or more than one.
+        """
+        matches = [[] for _ in blocks]
+        if not blocks:
+            return matches
+        entities = self.raw(
+            """
+            SELECT e.*, q.position
+            FROM unnest(%s::jsonb[]) WITH ORDINALITY AS q(block, position)
+            CROSS JOIN LATERAL (
+                SELECT * FROM {table}
+                WHERE domain_id = %s AND attributes @> q.block
+                LIMIT %s
+            ) e
+            """.format(table=self.model._meta.db_table),
+            [[json.dumps(block) for block in blocks], domain.pk, limit],
+        )
+        for entity in entities:
+            matches[entity.position - 1].append(entity)
+        return matches
+
+    def normalized_exact(self, domain, field, value):
+        """
+        Filter to entities in a domain with an attribute equal to a value
+        once both are normalized, ignoring case, punctuation and spacing.
+        """
+        return self.filter(
+            domain=domain,
+            lookup_hashes__contains=[
+                normalized_lookup_hash(domain.pk, field, value)
+            ],
+        )
+
+    def canonicals(self, entities):
+        """
+        Resolve the alias chains of many entities in one recursive query.
+
+        Returns a dict mapping each entity's UUID to its canonical entity,
+        which is the entity itself if it isn't an alias. A chain that loops
+        back on itself stops at the last entity before the loop.
+        """
+        uuids = list({str(entity.pk) for entity in entities})
+        if not uuids:
+            return {}
+        table = self.model._meta.db_table
+        canonicals = self.raw(
+            """
+            WITH RECURSIVE chain(start, uuid, alias_for_id, depth, path) AS (
+                SELECT uuid, uuid, alias_for_id, 0, ARRAY[uuid]
+                FROM {table}
+                WHERE uuid = ANY(%s::uuid[])
+              UNION ALL
+                SELECT chain.start, e.uuid, e.alias_for_id, chain.depth + 1,
+                    chain.path || e.uuid
+                FROM chain
+                JOIN {table} e ON e.uuid = chain.alias_for_id
+                WHERE NOT e.uuid = ANY(chain.path)
+            )
+            SELECT e.*, canonical.start AS canonical_for
+            FROM (
+                SELECT DISTINCT ON (start) start, uuid
+                FROM chain
+                ORDER BY start, depth DESC
+            ) canonical
+            JOIN {table} e ON e.uuid = canonical.uuid
+            """.format(table=table),
+            [uuids],
+        )
+        return {entity.canonical_for: entity for entity in canonicals}
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Set the canonical entity of aliases before inserting them."""
+        objs = list(objs)
+        self._assign_canonicals(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def copy_create(self, objs):
+        """
+        Insert entities with Postgres' COPY, which is faster than
+        bulk_create for large batches.
+
+        Only the UUID, domain, attributes and creator of each entity are
+        copied, so entities can't be aliases or superseded. Like
+        bulk_create, no signals are sent. Returns the entities.
+        """
+        objs = list(objs)
+        now = timezone.now()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for obj in objs:
+            obj.set_derived_fields()
+            obj.created = obj.updated = now
+            writer.writerow(
+                [
+                    obj.uuid,
+                    obj.domain_id,
+                    json.dumps(obj.attributes),
+                    obj.attributes_hash,
+                    "{%s}" % ",".join(str(h) for h in obj.lookup_hashes),
+                    json.dumps(obj.normalized),
+                    "{%s}" % ",".join(str(k) for k in obj.blocking_keys),
+                    now.isoformat(),
+                    now.isoformat(),
+                    obj.created_by_id,
+                ]
+            )
+        buffer.seek(0)
+        # copy_expert is called on the psycopg2 cursor, so wrap its errors
+        # in Django's to raise IntegrityError and DataError as usual.
+        with connection.cursor() as cursor, connection.wrap_database_errors:
+            cursor.copy_expert(
+                "COPY {} (uuid, domain_id, attributes, attributes_hash, "
+                "lookup_hashes, normalized, blocking_keys, created, updated, "
+                "created_by_id) "
+                "FROM STDIN WITH (FORMAT csv)".format(
+                    self.model._meta.db_table
+                ),
+                buffer,
+            )
+        return objs
+
+    def existing(self, domain, objs):
+        """
+        Find the stored entity in a domain with the UUID or, failing that,
+        the attributes of each of many unsaved entities, in one query.
+
+        Returns a list in the same order as objs, None for entities that
+        don't exist yet.
+        """
+        objs = list(objs)
+        for obj in objs:
+            # UUIDs passed as strings wouldn't equal the stored UUIDs.
+            obj.pk = self.model._meta.pk.to_python(obj.pk)
+            obj.attributes_hash = attributes_hash(obj.attributes)
+        stored = self.filter(domain=domain).filter(
+            Q(pk__in=[obj.pk for obj in objs if obj.pk is not None])
+            | Q(attributes_hash__in=[obj.attributes_hash for obj in objs])
+        )
+        by_pk, by_hash = {}, {}
+        for entity in stored:
+            by_pk[entity.pk] = by_hash[entity.attributes_hash] = entity
+        return [
+            by_pk.get(obj.pk) or by_hash.get(obj.attributes_hash)
+            for obj in objs
+        ]
+
+    def upsert(self, domain, objs, update=False):
+        """
+        Create the entities in a domain that don't exist yet, set-wise.
+
+        An entity exists if a stored entity in the domain has its UUID or
+        its attributes. Identical new entities in objs are created once. If
+        update is set, existing entities matched by UUID take on the new
+        attributes. No signals are sent.
+
+        Returns a list of (entity, created, updated) tuples in the same
+        order as objs. Raises IntegrityError if an entity conflicts with
+        one in another domain or an update duplicates another entity.
+        """
+        objs = list(objs)
+        for obj in objs:
+            if obj.pk is None:
+                obj.uuid = uuid.uuid4()
+        existing = self.existing(domain, objs)
+
+        new, updates = {}, {}
+        now = timezone.now()
+        for obj, stored in zip(objs, existing):
+            if stored is None:
+                new.setdefault(obj.attributes_hash, obj)
+            elif (
+                update
+                and stored.pk == obj.pk
+                and stored.attributes_hash != obj.attributes_hash
+            ):
+                stored = updates.setdefault(stored.pk, stored)
+                stored.attributes = obj.attributes
+                stored.set_derived_fields()
+                stored.updated = now
+
+        self.bulk_update(
+            updates.values(), ["attributes", *DERIVED_FIELDS, "updated"]
+        )
+        # Entities created concurrently are skipped and looked up below.
+        self.bulk_create(new.values(), ignore_conflicts=True)
+        inserted = {
+            entity.attributes_hash: entity
+            for entity in self.filter(
+                domain=domain, attributes_hash__in=list(new)
+            )
+        }
+
+        results = []
+        for obj, stored in zip(objs, existing):
+            if stored is not None:
+                stored = updates.get(stored.pk, stored)
+                results.append((stored, False, stored.pk in updates))
+                continue
+            entity = inserted.get(obj.attributes_hash)
+            if entity is None:
+                raise IntegrityError(
+                    "Entity {} exists in another domain.".format(obj.pk)
+                )
+            results.append((entity, entity.pk == obj.pk, False))
+        return results
+
+    def _assign_canonicals(self, objs):
+        if not any(obj.alias_for_id for obj in objs):
+            return
+        batch = {obj.pk: obj for obj in objs if obj.pk is not None}
+        stored = dict(
+            self.model.objects.filter(
+                pk__in={obj.alias_for_id for obj in objs} - set(batch)
+            ).values_list("uuid", "canonical_id")
+        )
+        for obj in objs:
+            target, seen = obj.alias_for_id, set()
+            # Follow aliases of other entities in the same batch.
+            while target in batch and target not in seen:
+                seen.add(target)
+                if batch[target].alias_for_id is None:
+                    break
+                target = batch[target].alias_for_id
+            obj.canonical_id = stored.get(target) or target
+
+    def rebuild_canonicals(self, domain=None):
+        """
+        Recompute the canonical entity of every alias, optionally only in
+        one domain. Returns the number of entities updated.
+        """
+        table = self.model._meta.db_table
+        where, params = "", []
+        if domain is not None:
+            where, params = "AND domain_id = %s", [domain.pk]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                WITH RECURSIVE chain(uuid, root, path) AS (
+                    SELECT uuid, uuid, ARRAY[uuid]
+                    FROM {table}
+                    WHERE alias_for_id IS NULL {where}
+                  UNION ALL
+                    SELECT e.uuid, chain.root, chain.path || e.uuid
+                    FROM chain
+                    JOIN {table} e ON e.alias_for_id = chain.uuid
+                    WHERE NOT e.uuid = ANY(chain.path)
+                )
+                UPDATE {table} e
+                SET canonical_id = NULLIF(chain.root, e.uuid)
+                FROM chain
+                WHERE e.uuid = chain.uuid
+                AND e.canonical_id IS DISTINCT FROM NULLIF(chain.root, e.uuid)
+                """.format(table=table, where=where),
+                params,
+            )
+            return cursor.rowcount
 
 
 class Entity(models.Model):
@@ -24,6 +339,14 @@ class Entity(models.Model):
         validators=[validate_shallow_dict, validate_no_reserved_keys]
     )
 
+    attributes_hash = AttributesHashField(editable=False)
+
+    lookup_hashes = LookupHashesField(editable=False, default=list)
+
+    normalized = NormalizedAttributesField(editable=False, default=dict)
+
+    blocking_keys = BlockingKeysField(editable=False, default=list)
+
     alias_for = models.ForeignKey(
         "self",
         null=True,
@@ -33,6 +356,17 @@ class Entity(models.Model):
         help_text="Entity in the same domain whose UUID supersedes this one.",
     )
 
+    canonical = models.ForeignKey(
+        "self",
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+        on_delete=models.SET_NULL,
+        help_text="Entity at the end of this entity's alias chain, if it's "
+        "an alias.",
+    )
+
     superseded_by = models.ForeignKey(
         "self",
         null=True,
@@ -48,6 +382,78 @@ class Entity(models.Model):
         User, related_name="+", null=True, on_delete=models.SET_NULL
     )
 
+    objects = EntityQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            # Derived fields are only recomputed if they're saved too.
+            if update_fields & {"attributes", "domain"}:
+                update_fields |= set(DERIVED_FIELDS)
+            kwargs["update_fields"] = update_fields
+            if "alias_for" not in update_fields:
+                return super(Entity, self).save(*args, **kwargs)
+
+        previous = self.canonical_id
+        self.canonical_id = self._resolve_canonical_id()
+        if update_fields is not None:
+            kwargs["update_fields"] = update_fields | {"canonical"}
+        adding = self._state.adding
+        super(Entity, self).save(*args, **kwargs)
+
+        # Re-point aliases of this entity if its own canonical changed.
+        if not adding and previous != self.canonical_id:
+            self._update_alias_canonicals()
+
+    def _resolve_canonical_id(self):
+        if self.alias_for_id is None:
+            return None
+        canonical_id = (
+            Entity.objects.filter(pk=self.alias_for_id)
+            .values_list("canonical_id", flat=True)
+            .first()
+        )
+        canonical_id = canonical_id or self.alias_for_id
+        # A corrupt chain looping back here has no canonical entity.
+        return None if canonical_id == self.pk else canonical_id
+
+    def _update_alias_canonicals(self):
+        table = Entity._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                WITH RECURSIVE aliases(uuid) AS (
+                    SELECT uuid FROM {table} WHERE alias_for_id = %s
+                  UNION
+                    SELECT e.uuid
+                    FROM aliases
+                    JOIN {table} e ON e.alias_for_id = aliases.uuid
+                )
+                UPDATE {table}
+                SET canonical_id = %s
+                WHERE uuid IN (SELECT uuid FROM aliases)
+                AND uuid != %s
+                """.format(table=table),
+                [self.pk, self.canonical_id or self.pk, self.pk],
+            )
+
+    def set_derived_fields(self):
+        """
+        Compute the fields derived from attributes, as saving does, for
+        writes such as bulk_update that skip it.
+        """
+        for name in DERIVED_FIELDS:
+            self._meta.get_field(name).pre_save(self, False)
+
+    def get_canonical(self):
+        """Return the entity at the end of this entity's alias chain."""
+        if self.alias_for_id is None:
+            return self
+        if self.canonical_id is not None:
+            return self.canonical
+        return Entity.objects.canonicals([self])[self.pk]
+
     @property
     def is_alias(self):
         return bool(self.alias_for)
@@ -61,7 +467,23 @@ class Entity(models.Model):
 
     class Meta:
         verbose_name_plural = "entities"
-        unique_together = ("domain", "attributes")
+        unique_together = ("domain", "attributes_hash")
+        indexes = [
+            GinIndex(
+                fields=["attributes"],
+                name="crosswalk_attributes_gin",
+                opclasses=["jsonb_path_ops"],
+            ),
+            models.Index(
+                fields=["domain", "alias_for"], name="crosswalk_domain_alias"
+            ),
+            GinIndex(
+                fields=["lookup_hashes"], name="crosswalk_lookup_hashes_gin"
+            ),
+            GinIndex(
+                fields=["blocking_keys"], name="crosswalk_blocking_keys_gin"
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=~Q(alias_for=F("uuid")), name="uuid_not_equal_alias"
@@ -0,0 +1,73 @@
+from crosswalk.metrics import scorer_name, timer
+
+
+def prepare(scorer, candidates):
+    """
+    Return the scorer and the candidate values to pass it for a block.
+
+    Scorers with a ``prepared`` attribute have a version that scores the
+    normalized or token-sorted candidate values stored on entities, named by
+    its ``form`` attribute, rather than processing every value on every
+    query. Indexes into either list refer to the same candidate.
+    """
+    prepared = getattr(scorer, "prepared", None)
+    if prepared is None:
+        return scorer, candidates.values
+    return prepared, getattr(candidates, prepared.form)
+
+
+def extract_one(scorer, query_value, block_values):
+    """
+    Call a scorer and return the index of the best match and its score.
+
+    Scorers return (match, score, index). Scorers written against the older
+    (match, score) signature are still supported by looking the match up in
+    block_values.
+    """
+    with timer("score", scorer_name(scorer)):
+        result = scorer(query_value, block_values)
+    if len(result) == 3:
+        match, score, index = result
+    else:
+        match, score = result
+        index = block_values.index(match)
+    return index, score
+
+
+def extract_top(scorer, query_value, block_values, limit, score_cutoff=None):
+    """
+    Return (index, score) of up to limit best matches for a query, best
+    first, leaving out matches scoring below score_cutoff.
+
+    Scorers with a ``top`` attribute keep the best matches with a bounded
+    heap and skip candidates below score_cutoff as they're scored. Other
+    scorers only return their single best match.
+    """
+    top = getattr(scorer, "top", None)
+    if top is not None:
+        with timer("score", scorer_name(scorer)):
+            return top(query_value, block_values, limit, score_cutoff)
+    index, score = extract_one(scorer, query_value, block_values)
+    if score_cutoff is not None and score < score_cutoff:
+        return []
+    return [(index, score)]
+
+
+def extract_many(scorer, query_values, block_values, score_cutoff=None):
+    """
+    Return (index, score) of the best match for each of a list of queries,
+    or None where no match scores at least score_cutoff.
+
+    Scorers with a ``many`` attribute score the whole batch in one call;
+    other scorers are called once per query.
+    """
+    many = getattr(scorer, "many", None)
+    if many is not None:
+        with timer("score", scorer_name(scorer)):
+            return many(query_values, block_values, score_cutoff)
+    if score_cutoff is None:
+        return [extract_one(scorer, q, block_values) for q in query_values]
+    return [
+        next(iter(extract_top(scorer, q, block_values, 1, score_cutoff)), None)
+        for q in query_values
+    ]
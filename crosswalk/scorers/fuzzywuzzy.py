@@ -1,23 +1,123 @@
-from fuzzywuzzy import fuzz, process
+from functools import partial
 
+from crosswalk.fields import normalize, token_sort
+from fuzzywuzzy import fuzz, process, utils
 
-def default_process(query_value, block_values):
-    return process.extractOne(query_value, block_values)
 
+def _extract_one(query_value, block_values, score_cutoff=0, **kwargs):
+    """
+    Return the best match, its score and its index in block_values, or None
+    if no candidate scores at least score_cutoff.
 
-def partial_ratio_process(query_value, block_values):
+    Choices are passed to fuzzywuzzy keyed by position, so the caller can map
+    the match straight back to a candidate even when values are duplicated.
+    """
     return process.extractOne(
-        query_value, block_values, scorer=fuzz.partial_ratio
+        query_value,
+        dict(enumerate(block_values)),
+        score_cutoff=score_cutoff or 0,
+        **kwargs
     )
 
 
-def token_sort_ratio_process(query_value, block_values):
-    return process.extractOne(
-        query_value, block_values, scorer=fuzz.token_sort_ratio
+def _extract_top(scorer, processor=utils.full_process):
+    def extract_top(query_value, block_values, limit, score_cutoff=0):
+        # extractBests drops candidates below score_cutoff before keeping
+        # the best with a bounded heap.
+        return [
+            (index, score)
+            for match, score, index in process.extractBests(
+                query_value,
+                dict(enumerate(block_values)),
+                processor=processor,
+                scorer=scorer,
+                score_cutoff=score_cutoff or 0,
+                limit=limit,
+            )
+        ]
+
+    return extract_top
+
+
+def default_process(query_value, block_values, score_cutoff=0):
+    return _extract_one(query_value, block_values, score_cutoff)
+
+
+def partial_ratio_process(query_value, block_values, score_cutoff=0):
+    return _extract_one(
+        query_value, block_values, score_cutoff, scorer=fuzz.partial_ratio
     )
 
 
-def token_set_ratio_process(query_value, block_values):
-    return process.extractOne(
-        query_value, block_values, scorer=fuzz.token_set_ratio
+def token_sort_ratio_process(query_value, block_values, score_cutoff=0):
+    return _extract_one(
+        query_value, block_values, score_cutoff, scorer=fuzz.token_sort_ratio
+    )
+
+
+def token_set_ratio_process(query_value, block_values, score_cutoff=0):
+    return _extract_one(
+        query_value, block_values, score_cutoff, scorer=fuzz.token_set_ratio
     )
+
+
+default_process.top = _extract_top(fuzz.WRatio)
+partial_ratio_process.top = _extract_top(fuzz.partial_ratio)
+token_sort_ratio_process.top = _extract_top(fuzz.token_sort_ratio)
+token_set_ratio_process.top = _extract_top(fuzz.token_set_ratio)
+
+# These compare values word by word, so CROSSWALK_TOKEN_INDEX can narrow them
+# to candidates sharing words with a query.
+token_sort_ratio_process.token_based = True
+token_set_ratio_process.token_based = True
+
+
+def _prepared(original, scorer, form):
+    """
+    Return a version of a process that scores candidates already in the
+    given form of crosswalk.candidates.Candidates, normalized or
+    token-sorted, with the same results.
+
+    Only the query is processed, the way fuzzywuzzy processes it: once with
+    its default processor and again as the scorer does.
+    """
+
+    def prepare_query(query_value):
+        normalized = normalize(utils.full_process(query_value))
+        return token_sort(normalized) if form == "token_sorted" else normalized
+
+    def prepared(query_value, block_values, score_cutoff=0):
+        return _extract_one(
+            prepare_query(query_value),
+            block_values,
+            score_cutoff,
+            processor=None,
+            scorer=scorer,
+        )
+
+    extract_top = _extract_top(scorer, processor=None)
+
+    def top(query_value, block_values, limit, score_cutoff=0):
+        return extract_top(
+            prepare_query(query_value), block_values, limit, score_cutoff
+        )
+
+    # Report scoring time under the original process' name.
+    prepared.__name__ = original.__name__
+    prepared.form = form
+    prepared.top = top
+    return prepared
+
+
+# partial_ratio_process keeps non-ASCII characters, so it isn't prepared.
+default_process.prepared = _prepared(
+    default_process, partial(fuzz.WRatio, full_process=False), "normalized"
+)
+token_sort_ratio_process.prepared = _prepared(
+    token_sort_ratio_process, fuzz.ratio, "token_sorted"
+)
+token_set_ratio_process.prepared = _prepared(
+    token_set_ratio_process,
+    partial(fuzz.token_set_ratio, full_process=False),
+    "normalized",
+)
@@ -0,0 +1,127 @@
+"""
+Scorers backed by RapidFuzz, a C++ implementation of fuzzywuzzy's scorers.
+
+Each process has the same signature and return value as its counterpart in
+crosswalk.scorers.fuzzywuzzy and accepts an optional score_cutoff, below
+which candidates are pruned without being fully scored. Each process also
+has a ``many`` attribute that scores a list of queries against the same
+candidates in a single call, returning an (index, score) tuple, or None if
+no candidate reaches score_cutoff, for each query, and a ``top`` attribute
+that returns the (index, score) tuples of up to limit of the best
+candidates for one query.
+
+Scores are rounded to integers like fuzzywuzzy's, but these aren't drop-in
+replacements for the fuzzywuzzy scorers:
+
+- partial_ratio_process and default_process (WRatio) find the optimal
+  partial alignment where fuzzywuzzy uses a heuristic. Their scores are at
+  most 1 point lower than fuzzywuzzy's but can be tens of points higher on
+  multi-word values, so a different candidate can be the best match.
+- Non-ASCII characters are kept rather than stripped before scoring.
+"""
+import numpy
+from rapidfuzz import fuzz, process, utils
+
+# Largest number of scores computed in one cdist call, to bound the memory
+# used by the score matrix when a batch is scored against a large block.
+MAX_CDIST_CELLS = 10000000
+
+
+def _process(value):
+    # Attribute values can be numbers or booleans, which fuzzywuzzy scores
+    # as strings.
+    return utils.default_process(str(value))
+
+
+def _extract_one(scorer, query_value, block_values, score_cutoff=None):
+    result = process.extractOne(
+        query_value,
+        block_values,
+        scorer=scorer,
+        processor=_process,
+        score_cutoff=score_cutoff,
+    )
+    if result is None:
+        return None
+    match, score, index = result
+    return match, int(round(score)), index
+
+
+def _extract_many(scorer):
+    def extract_many(query_values, block_values, score_cutoff=None):
+        if not block_values:
+            return [None] * len(query_values)
+        queries = [_process(q) for q in query_values]
+        choices = [_process(c) for c in block_values]
+        rows = max(1, MAX_CDIST_CELLS // len(choices))
+        results = []
+        for start in range(0, len(queries), rows):
+            scores = process.cdist(
+                queries[start : start + rows],
+                choices,
+                scorer=scorer,
+                score_cutoff=score_cutoff,
+                workers=-1,
+            )
+            for row, index in zip(scores, numpy.argmax(scores, axis=1)):
+                score = row[index]
+                if score_cutoff is not None and score < score_cutoff:
+                    results.append(None)
+                else:
+                    results.append((int(index), int(round(score))))
+        return results
+
+    return extract_many
+
+
+def _extract_top(scorer):
+    def extract_top(query_value, block_values, limit, score_cutoff=None):
+        results = process.extract(
+            query_value,
+            block_values,
+            scorer=scorer,
+            processor=_process,
+            limit=limit,
+            score_cutoff=score_cutoff,
+        )
+        return [(index, int(round(score))) for _, score, index in results]
+
+    return extract_top
+
+
+def default_process(query_value, block_values, score_cutoff=None):
+    return _extract_one(fuzz.WRatio, query_value, block_values, score_cutoff)
+
+
+def partial_ratio_process(query_value, block_values, score_cutoff=None):
+    return _extract_one(
+        fuzz.partial_ratio, query_value, block_values, score_cutoff
+    )
+
+
+def token_sort_ratio_process(query_value, block_values, score_cutoff=None):
+    return _extract_one(
+        fuzz.token_sort_ratio, query_value, block_values, score_cutoff
+    )
+
+
+def token_set_ratio_process(query_value, block_values, score_cutoff=None):
+    return _extract_one(
+        fuzz.token_set_ratio, query_value, block_values, score_cutoff
+    )
+
+
+default_process.many = _extract_many(fuzz.WRatio)
+partial_ratio_process.many = _extract_many(fuzz.partial_ratio)
+token_sort_ratio_process.many = _extract_many(fuzz.token_sort_ratio)
+token_set_ratio_process.many = _extract_many(fuzz.token_set_ratio)
+
+default_process.top = _extract_top(fuzz.WRatio)
+partial_ratio_process.top = _extract_top(fuzz.partial_ratio)
+token_sort_ratio_process.top = _extract_top(fuzz.token_sort_ratio)
+token_set_ratio_process.top = _extract_top(fuzz.token_set_ratio)
+
+# These compare values word by word, so CROSSWALK_TOKEN_INDEX can narrow them
+# to candidates sharing words with a query.
+token_sort_ratio_process.token_based = True
+token_set_ratio_process.token_based = True
@@ -1,7 +1,12 @@
+from itertools import islice
+
 from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist
 from rest_framework import serializers
 
+from .candidates import candidate_index
+from .fields import attributes_hash
+from .metrics import timer
 from .models import Domain, Entity
 
 
@@ -11,14 +16,33 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ("username", "first_name", "last_name", "email")
 
 
+class DomainSlugField(serializers.SlugRelatedField):
+    """
+    Represent a domain by its slug, resolved through the domain cache rather
+    than a query per object.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("slug_field", "slug")
+        kwargs.setdefault("queryset", Domain.objects.all())
+        super().__init__(**kwargs)
+
+    def use_pk_only_optimization(self):
+        return True
+
+    def to_internal_value(self, data):
+        try:
+            return Domain.objects.get_cached(slug=str(data))
+        except ObjectDoesNotExist:
+            self.fail("does_not_exist", slug_name=self.slug_field, value=data)
+
+    def to_representation(self, value):
+        return Domain.objects.get_cached(pk=value.pk).slug
+
+
 class DomainSerializer(serializers.ModelSerializer):
     name = serializers.CharField(validators=[])
-    parent = serializers.SlugRelatedField(
-        slug_field="slug",
-        queryset=Domain.objects.all(),
-        required=False,
-        allow_null=True,
-    )
+    parent = DomainSlugField(required=False, allow_null=True)
 
     def create(self, validated_data):
         try:
@@ -26,27 +50,32 @@ class DomainSerializer(serializers.ModelSerializer):
         except ObjectDoesNotExist:
             parent = None
         domain, created = Domain.objects.get_or_create(
-            name=validated_data.get("name"), defaults={"parent": parent}
+            name=validated_data.get("name"),
+            defaults={
+                "parent": parent,
+                "blocking": validated_data.get("blocking", []),
+            },
         )
         return domain
 
     class Meta:
         model = Domain
         lookup_field = "slug"
-        fields = ("slug", "name", "parent")
+        fields = ("slug", "name", "parent", "blocking")
 
 
 class EntityListSerializer(serializers.ListSerializer):
     def create(self, validated_data):
         entities = [Entity(**data) for data in validated_data]
-        return Entity.objects.bulk_create(entities)
+        created = Entity.objects.bulk_create(entities)
+        for domain in {entity.domain for entity in created}:
+            candidate_index.invalidate(domain)
+        return created
 
 
 class EntitySerializer(serializers.ModelSerializer):
     uuid = serializers.UUIDField(format="hex_verbose", required=False)
-    domain = serializers.SlugRelatedField(
-        slug_field="slug", queryset=Domain.objects.all()
-    )
+    domain = DomainSlugField()
     alias_for = serializers.PrimaryKeyRelatedField(
         queryset=Entity.objects.all(),
         required=False,
@@ -60,7 +89,104 @@ class EntitySerializer(serializers.ModelSerializer):
         pk_field=serializers.UUIDField(format="hex_verbose"),
     )
 
+    def validate(self, data):
+        domain = data.get("domain", getattr(self.instance, "domain", None))
+        attributes = data.get(
+            "attributes", getattr(self.instance, "attributes", None)
+        )
+        if domain is not None and attributes is not None:
+            duplicates = Entity.objects.filter(
+                domain=domain, attributes_hash=attributes_hash(attributes)
+            )
+            if self.instance is not None:
+                duplicates = duplicates.exclude(pk=self.instance.pk)
+            if duplicates.exists():
+                raise serializers.ValidationError(
+                    "The fields domain, attributes must make a unique set."
+                )
+        return data
+
     class Meta:
         model = Entity
         list_serializer_class = EntityListSerializer
         fields = ("uuid", "attributes", "domain", "superseded_by", "alias_for")
+
+
+ENTITY_VALUES = (
+    "uuid",
+    "attributes",
+    "domain_id",
+    "superseded_by_id",
+    "alias_for_id",
+)
+
+
+def serialize_entity_row(row, slugs=None):
+    """
+    Serialize a dict of ENTITY_VALUES, as returned by values(), in the same
+    format as EntitySerializer but without its per-field overhead.
+
+    Pass the same dict as slugs when serializing many rows to memoize
+    domain slugs by primary key.
+    """
+    slugs = {} if slugs is None else slugs
+    domain_id = row["domain_id"]
+    if domain_id not in slugs:
+        slugs[domain_id] = Domain.objects.get_cached(pk=domain_id).slug
+    superseded_by = row["superseded_by_id"]
+    alias_for = row["alias_for_id"]
+    return {
+        "uuid": str(row["uuid"]),
+        "attributes": row["attributes"],
+        "domain": slugs[domain_id],
+        "superseded_by": None if superseded_by is None else str(superseded_by),
+        "alias_for": None if alias_for is None else str(alias_for),
+    }
+
+
+def serialize_entity(entity, slugs=None):
+    """Serialize an entity in the same format as EntitySerializer."""
+    return serialize_entity_row(
+        {field: getattr(entity, field) for field in ENTITY_VALUES}, slugs
+    )
+
+
+def serialize_match(entity, score, return_canonical=True):
+    """
+    Serialize a matched entity and its score, replacing an alias with its
+    canonical entity if return_canonical is set.
+    """
+    aliased = False
+    if return_canonical and entity.alias_for_id:
+        aliased = True
+        entity = entity.get_canonical()
+    return {
+        "entity": serialize_entity(entity),
+        "match_score": score,
+        "aliased": aliased,
+    }
+
+
+def iter_serialized_entities(queryset, chunk_size=2000):
+    """
+    Serialize the entities in a queryset one at a time, fetching rows in
+    chunks through a server-side cursor so memory use stays flat.
+    """
+    slugs = {}
+    rows = queryset.values(*ENTITY_VALUES).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield serialize_entity_row(row, slugs)
+
+
+def serialize_entities(queryset, chunk_size=2000):
+    """
+    Serialize the entities in a queryset, loading only the serialized
+    columns in chunks.
+    """
+    results, slugs = [], {}
+    rows = queryset.values(*ENTITY_VALUES).iterator(chunk_size=chunk_size)
+    # Time each chunk rather than each row, leaving out fetching rows.
+    for chunk in iter(lambda: list(islice(rows, chunk_size)), []):
+        with timer("serialize"):
+            results.extend(serialize_entity_row(row, slugs) for row in chunk)
+    return results
@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from crosswalk.authentication import token_cache
+from crosswalk.candidates import candidate_index
+from crosswalk.models import ApiUser, Domain, Entity
+from crosswalk.models.domain import domain_cache
+
+
+@receiver(post_save, sender=Entity)
+def update_candidate_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: candidate_index.update(instance))
+
+
+@receiver(post_delete, sender=Entity)
+def discard_from_candidate_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: candidate_index.discard(instance))
+
+
+@receiver(post_save, sender=ApiUser)
+@receiver(post_delete, sender=ApiUser)
+def invalidate_token_cache(sender, instance, **kwargs):
+    token_cache.invalidate(instance.token)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_token_cache(sender, instance, **kwargs):
+    token_cache.invalidate_user(instance)
+
+
+@receiver(post_save, sender=Domain)
+@receiver(post_delete, sender=Domain)
+def clear_domain_cache(sender, instance, **kwargs):
+    transaction.on_commit(domain_cache.clear)
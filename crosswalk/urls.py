@@ -4,13 +4,19 @@ from rest_framework import routers
 from .views import (
     AliasOrCreate,
     BestMatch,
+    BestMatchBatch,
     BestMatchOrCreate,
+    BestMatchOrCreateBatch,
     BulkCreate,
+    BulkImport,
     ClientCheck,
     DeleteMatch,
+    DeleteMatchBatch,
     MatchOrCreate,
     Match,
+    Metrics,
     UpdateMatch,
+    UpdateMatchBatch,
 )
 from .viewsets import DomainViewSet, EntityDomainViewSet, EntityViewSet
 
@@ -48,13 +54,24 @@ urlpatterns = [
     path(
         "api/domains/<slug:domain>/entities/bulk-create/", BulkCreate.as_view()
     ),
+    path(
+        "api/domains/<slug:domain>/entities/bulk-import/", BulkImport.as_view()
+    ),
     path(
         "api/domains/<slug:domain>/entities/best-match/", BestMatch.as_view()
     ),
+    path(
+        "api/domains/<slug:domain>/entities/best-match/batch/",
+        BestMatchBatch.as_view(),
+    ),
     path(
         "api/domains/<slug:domain>/entities/best-match-or-create/",
         BestMatchOrCreate.as_view(),
     ),
+    path(
+        "api/domains/<slug:domain>/entities/best-match-or-create/batch/",
+        BestMatchOrCreateBatch.as_view(),
+    ),
     path("api/domains/<slug:domain>/entities/match/", Match.as_view()),
     path(
         "api/domains/<slug:domain>/entities/match-or-create/",
@@ -64,10 +81,18 @@ urlpatterns = [
         "api/domains/<slug:domain>/entities/delete-match/",
         DeleteMatch.as_view(),
     ),
+    path(
+        "api/domains/<slug:domain>/entities/delete-match/batch/",
+        DeleteMatchBatch.as_view(),
+    ),
     path(
         "api/domains/<slug:domain>/entities/update-match/",
         UpdateMatch.as_view(),
     ),
+    path(
+        "api/domains/<slug:domain>/entities/update-match/batch/",
+        UpdateMatchBatch.as_view(),
+    ),
     path(
         "api/domains/<slug:domain>/entities/alias-or-create/",
         AliasOrCreate.as_view(),
@@ -83,4 +108,5 @@ urlpatterns = [
         name="crosswalk-entity-detail",
     ),
     path("api/client-check/", ClientCheck.as_view()),
+    path("api/metrics/", Metrics.as_view()),
 ]
@@ -1,10 +1,16 @@
 # flake8: noqa
 from .alias_or_create import AliasOrCreate
 from .best_match_or_create import BestMatchOrCreate
+from .best_match_or_create_batch import BestMatchOrCreateBatch
 from .best_match import BestMatch
+from .best_match_batch import BestMatchBatch
 from .bulk_create import BulkCreate
+from .bulk_import import BulkImport
 from .client_check import ClientCheck
 from .delete_match import DeleteMatch
+from .delete_match_batch import DeleteMatchBatch
 from .match_or_create import MatchOrCreate
 from .match import Match
+from .metrics import Metrics
 from .update_match import UpdateMatch
+from .update_match_batch import UpdateMatchBatch
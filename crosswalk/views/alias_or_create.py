@@ -1,8 +1,11 @@
 from crosswalk.authentication import AuthenticatedView
+from crosswalk.candidates import candidate_index
+from crosswalk.matching import best_match
 from crosswalk.models import Domain, Entity
-from crosswalk.serializers import EntitySerializer
+from crosswalk.serializers import serialize_entity
 from crosswalk.utils import import_class
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, transaction
 from rest_framework import status
 from rest_framework.response import Response
 
@@ -22,6 +25,7 @@ class AliasOrCreate(AuthenticatedView):
         return_canonical = data.get("return_canonical", True)
         threshold = data.get("threshold")
         scorer_class = data.get("scorer", "fuzzywuzzy.default_process")
+        fallback = data.get("blocking_fallback", False)
 
         try:
             scorer = import_class("crosswalk.scorers.{}".format(scorer_class))
@@ -31,30 +35,33 @@ class AliasOrCreate(AuthenticatedView):
             )
 
         try:
-            domain = Domain.objects.get(slug=domain)
+            domain = Domain.objects.get_cached(slug=domain)
         except ObjectDoesNotExist:
             return Response(
                 "Domain not found.", status=status.HTTP_404_NOT_FOUND
             )
 
         # Find the best match for a query
-        entities = Entity.objects.filter(domain=domain)
-        entities = entities.filter(attributes__contains=block_attrs)
-
-        entity_values = [e.attributes[query_field] for e in entities]
-        match, score = scorer(query_value, entity_values)
-
-        entities = entities.filter(
-            **{"attributes__{}".format(query_field): match}
+        entity, match, score = best_match(
+            domain,
+            query_field,
+            query_value,
+            block_attrs,
+            scorer,
+            threshold,
+            fallback,
         )
 
-        if entities.count() > 1:
-            return Response(
-                "More than one alias candiate for entity.",
-                status=status.HTTP_403_FORBIDDEN,
+        if entity is not None:
+            matched = Entity.objects.filter(
+                domain=domain,
+                attributes__contains={**block_attrs, query_field: match},
             )
-
-        entity = entities.first()
+            if len(matched[:2]) > 1:
+                return Response(
+                    "More than one alias candiate for entity.",
+                    status=status.HTTP_403_FORBIDDEN,
+                )
 
         attributes = {
             **{query_field: query_value},
@@ -62,34 +69,37 @@ class AliasOrCreate(AuthenticatedView):
             **create_attrs,
         }
 
-        if entity.attributes == attributes:
+        if entity is not None and entity.attributes == attributes:
             return Response(
                 "Entity appears to already exist.",
                 status=status.HTTP_409_CONFLICT,
             )
 
-        if score > threshold:
-            aliased = True
-            alias = Entity(
-                attributes=attributes,
-                alias_for=entity,
-                created_by=user,
-                domain=domain,
-            )
-            alias.save()
-            if return_canonical:
-                while entity.alias_for:
-                    entity = entity.alias_for
-        else:
-            aliased = False
-            entity = Entity(
-                attributes=attributes, created_by=user, domain=domain
+        aliased = entity is not None and score > threshold
+        new = Entity(
+            attributes=attributes,
+            alias_for=entity if aliased else None,
+            created_by=user,
+            domain=domain,
+        )
+        try:
+            with transaction.atomic():
+                new.save()
+        except IntegrityError:
+            # Created by another process since the block was cached.
+            candidate_index.invalidate(domain)
+            return Response(
+                "Entity appears to already exist.",
+                status=status.HTTP_409_CONFLICT,
             )
-            entity.save()
+        if not aliased:
+            entity = new
+        elif return_canonical:
+            entity = entity.get_canonical()
 
         return Response(
             {
-                "entity": EntitySerializer(entity).data,
+                "entity": serialize_entity(entity),
                 "created": True,
                 "aliased": aliased,
                 "match_score": score,
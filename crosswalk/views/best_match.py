@@ -1,6 +1,7 @@
 from crosswalk.authentication import AuthenticatedView
-from crosswalk.models import Domain, Entity
-from crosswalk.serializers import EntitySerializer
+from crosswalk.matching import best_match, top_matches, top_options
+from crosswalk.models import Domain
+from crosswalk.serializers import serialize_match
 from crosswalk.utils import import_class
 from django.core.exceptions import ObjectDoesNotExist
 from rest_framework import status
@@ -12,8 +13,11 @@ class BestMatch(AuthenticatedView):
         """
         Get the best matched entity for a given query.
 
-        If the entity is an alias of another entity, the aliased entity is
-        returned.
+        Pass limit to get up to that many of the best matches instead, best
+        first, and score_cutoff to leave out matches scoring below it. Pass
+        blocking_fallback to search wider blocks when the domain's blocking
+        strategies find no match. If an entity is an alias of another
+        entity, the aliased entity is returned.
         """
         data = request.data.copy()
         query_field = data.get("query_field")
@@ -21,6 +25,12 @@ class BestMatch(AuthenticatedView):
         return_canonical = data.get("return_canonical", True)
         block_attrs = data.get("block_attrs", {})
         scorer_class = data.get("scorer", "fuzzywuzzy.default_process")
+        fallback = data.get("blocking_fallback", False)
+
+        try:
+            limit, score_cutoff = top_options(data)
+        except ValueError as e:
+            return Response(str(e), status=status.HTTP_400_BAD_REQUEST)
 
         try:
             scorer = import_class("crosswalk.scorers.{}".format(scorer_class))
@@ -30,38 +40,42 @@ class BestMatch(AuthenticatedView):
             )
 
         try:
-            domain = Domain.objects.get(slug=domain)
+            domain = Domain.objects.get_cached(slug=domain)
         except ObjectDoesNotExist:
             return Response(
                 "Domain not found.", status=status.HTTP_404_NOT_FOUND
             )
 
-        entities = Entity.objects.filter(domain=domain)
-        entities = entities.filter(attributes__contains=block_attrs)
-
-        if entities.count() == 0:
-            return Response({}, status=status.HTTP_200_OK)
-
-        entity_values = [e.attributes[query_field] for e in entities]
-
-        match, score = scorer(query_value, entity_values)
-
-        entity = entities.filter(
-            **{"attributes__{}".format(query_field): match}
-        ).first()
-
-        aliased = False
-
-        if return_canonical:
-            while entity.alias_for:
-                aliased = True
-                entity = entity.alias_for
+        if limit is None and score_cutoff is None:
+            matches = [
+                best_match(
+                    domain,
+                    query_field,
+                    query_value,
+                    block_attrs,
+                    scorer,
+                    fallback=fallback,
+                )
+            ]
+        else:
+            matches = top_matches(
+                domain,
+                query_field,
+                query_value,
+                block_attrs,
+                scorer,
+                limit or 1,
+                score_cutoff,
+                fallback,
+            )
+        results = [
+            serialize_match(entity, score, return_canonical)
+            for entity, match, score in matches
+            if entity is not None
+        ]
 
+        if limit is not None:
+            return Response({"matches": results}, status=status.HTTP_200_OK)
         return Response(
-            {
-                "entity": EntitySerializer(entity).data,
-                "match_score": score,
-                "aliased": aliased,
-            },
-            status=status.HTTP_200_OK,
+            results[0] if results else {}, status=status.HTTP_200_OK
         )
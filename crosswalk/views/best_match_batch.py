@@ -0,0 +1,88 @@
+from crosswalk.authentication import AuthenticatedView
+from crosswalk.matching import (
+    batch_top_matches,
+    best_matches,
+    top_options,
+)
+from crosswalk.models import Domain
+from crosswalk.serializers import serialize_match
+from crosswalk.utils import import_class
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class BestMatchBatch(AuthenticatedView):
+    def post(self, request, domain):
+        """
+        Get the best matched entity for each of a list of queries.
+
+        Results are returned in the same order as the queries. Pass limit
+        and score_cutoff as for a single best match. If an entity is an
+        alias of another entity, the aliased entity is returned.
+        """
+        data = request.data.copy()
+        queries = data.get("queries")
+        return_canonical = data.get("return_canonical", True)
+        scorer_class = data.get("scorer", "fuzzywuzzy.default_process")
+        max_size = getattr(settings, "CROSSWALK_MAX_BATCH_SIZE", 10000)
+
+        if not isinstance(queries, list) or not all(
+            isinstance(q, dict) and "query_field" in q and "query_value" in q
+            for q in queries
+        ):
+            return Response(
+                "Invalid queries.", status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if len(queries) > max_size:
+            return Response(
+                "Too many queries. Maximum is {}.".format(max_size),
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            limit, score_cutoff = top_options(data)
+        except ValueError as e:
+            return Response(str(e), status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            scorer = import_class("crosswalk.scorers.{}".format(scorer_class))
+        except ImportError:
+            return Response(
+                "Invalid scorer.", status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            domain = Domain.objects.get_cached(slug=domain)
+        except ObjectDoesNotExist:
+            return Response(
+                "Domain not found.", status=status.HTTP_404_NOT_FOUND
+            )
+
+        if limit is not None:
+            matches = batch_top_matches(
+                domain, queries, scorer, limit, score_cutoff
+            )
+            results = [
+                {
+                    "matches": [
+                        serialize_match(entity, score, return_canonical)
+                        for entity, match, score in query_matches
+                    ]
+                }
+                for query_matches in matches
+            ]
+            return Response({"results": results}, status=status.HTTP_200_OK)
+
+        matches = best_matches(domain, queries, scorer, score_cutoff)
+        results = [
+            (
+                {}
+                if entity is None
+                else serialize_match(entity, score, return_canonical)
+            )
+            for entity, match, score in matches
+        ]
+        return Response({"results": results}, status=status.HTTP_200_OK)
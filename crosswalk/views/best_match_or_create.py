@@ -1,8 +1,11 @@
 from crosswalk.authentication import AuthenticatedView
+from crosswalk.candidates import candidate_index
+from crosswalk.matching import best_match
 from crosswalk.models import Domain, Entity
-from crosswalk.serializers import EntitySerializer
+from crosswalk.serializers import serialize_entity
 from crosswalk.utils import import_class
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, transaction
 from rest_framework import status
 from rest_framework.response import Response
 
@@ -25,6 +28,7 @@ class BestMatchOrCreate(AuthenticatedView):
         threshold = data.get("threshold")
         return_canonical = data.get("return_canonical", True)
         scorer_class = data.get("scorer", "fuzzywuzzy.default_process")
+        fallback = data.get("blocking_fallback", False)
 
         try:
             scorer = import_class("crosswalk.scorers.{}".format(scorer_class))
@@ -34,26 +38,25 @@ class BestMatchOrCreate(AuthenticatedView):
             )
 
         try:
-            domain = Domain.objects.get(slug=domain)
+            domain = Domain.objects.get_cached(slug=domain)
         except ObjectDoesNotExist:
             return Response(
                 "Domain not found.", status=status.HTTP_404_NOT_FOUND
             )
 
-        entities = Entity.objects.filter(domain=domain)
-        entities = entities.filter(attributes__contains=block_attrs)
+        entity, match, score = best_match(
+            domain,
+            query_field,
+            query_value,
+            block_attrs,
+            scorer,
+            threshold,
+            fallback,
+        )
 
-        if entities.count() == 0:
-            score = None
+        if entity is None:
             created = True
         else:
-            entity_values = [e.attributes[query_field] for e in entities]
-            match, score = scorer(query_value, entity_values)
-
-            entity = entities.filter(
-                **{"attributes__{}".format(query_field): match}
-            ).first()
-
             created = True if score < threshold else False
 
         if created:
@@ -69,17 +72,37 @@ class BestMatchOrCreate(AuthenticatedView):
                 created_by=user,
                 domain=domain,
             )
-            entity.save()
+            try:
+                with transaction.atomic():
+                    entity.save()
+            except IntegrityError:
+                # Created by another process since the block was cached, so
+                # match against a fresh block instead.
+                candidate_index.invalidate(domain)
+                entity, match, score = best_match(
+                    domain,
+                    query_field,
+                    query_value,
+                    block_attrs,
+                    scorer,
+                    threshold,
+                    fallback,
+                )
+                if entity is None or score < threshold:
+                    return Response(
+                        "Entity conflicts with an existing entity.",
+                        status=status.HTTP_409_CONFLICT,
+                    )
+                created = False
 
         aliased = False
-        if return_canonical:
-            while entity.alias_for:
-                aliased = True
-                entity = entity.alias_for
+        if return_canonical and entity.alias_for_id:
+            aliased = True
+            entity = entity.get_canonical()
 
         return Response(
             {
-                "entity": EntitySerializer(entity).data,
+                "entity": serialize_entity(entity),
                 "created": created,
                 "match_score": score,
                 "aliased": aliased,
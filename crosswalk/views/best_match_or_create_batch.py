@@ -0,0 +1,140 @@
+import json
+import uuid
+
+from crosswalk.authentication import AuthenticatedView
+from crosswalk.candidates import candidate_index
+from crosswalk.matching import best_matches, threshold_option
+from crosswalk.models import Domain, Entity
+from crosswalk.serializers import serialize_entity
+from crosswalk.utils import import_class
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class BestMatchOrCreateBatch(AuthenticatedView):
+    def post(self, request, domain):
+        """
+        Get the best matched entity for each of a list of queries or create
+        entities for queries not matched above a certain threshold.
+
+        All new entities are inserted in a single transaction. Queries that
+        would create identical entities create only one. Results are
+        returned in the same order as the queries. If an entity is an alias
+        of another entity, the aliased entity is returned.
+        """
+        user = request.user
+        data = request.data.copy()
+        queries = data.get("queries")
+        return_canonical = data.get("return_canonical", True)
+        scorer_class = data.get("scorer", "fuzzywuzzy.default_process")
+        max_size = getattr(settings, "CROSSWALK_MAX_BATCH_SIZE", 10000)
+
+        if not isinstance(queries, list) or not all(
+            isinstance(q, dict) and "query_field" in q and "query_value" in q
+            for q in queries
+        ):
+            return Response(
+                "Invalid queries.", status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if len(queries) > max_size:
+            return Response(
+                "Too many queries. Maximum is {}.".format(max_size),
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            threshold = threshold_option(data)
+        except ValueError as e:
+            return Response(str(e), status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            scorer = import_class("crosswalk.scorers.{}".format(scorer_class))
+        except ImportError:
+            return Response(
+                "Invalid scorer.", status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            domain = Domain.objects.get_cached(slug=domain)
+        except ObjectDoesNotExist:
+            return Response(
+                "Domain not found.", status=status.HTTP_404_NOT_FOUND
+            )
+
+        matches = best_matches(domain, queries, scorer)
+
+        # Build one new entity per distinct set of attributes.
+        new_entities = {}
+        results = []
+        for query, (entity, match, score) in zip(queries, matches):
+            if entity is not None and score >= threshold:
+                results.append((entity, False, score))
+                continue
+
+            create_attrs = dict(query.get("create_attrs", {}))
+            pk = create_attrs.pop("uuid", None)
+            if pk is not None:
+                try:
+                    pk = uuid.UUID(str(pk))
+                except ValueError:
+                    return Response(
+                        "Invalid UUID.", status=status.HTTP_400_BAD_REQUEST
+                    )
+            attributes = {
+                **{query["query_field"]: query["query_value"]},
+                **query.get("block_attrs", {}),
+                **create_attrs,
+            }
+            key = json.dumps(attributes, sort_keys=True)
+            if key not in new_entities:
+                new_entities[key] = Entity(
+                    uuid=pk,
+                    attributes=attributes,
+                    created_by=user,
+                    domain=domain,
+                )
+            results.append((key, True, score))
+
+        saved = {}
+        if new_entities:
+            try:
+                with transaction.atomic():
+                    # Entities created since the queries were matched are
+                    # returned rather than duplicated.
+                    upserted = Entity.objects.upsert(
+                        domain, new_entities.values()
+                    )
+                    # upsert doesn't send post_save, so rebuild candidates.
+                    transaction.on_commit(
+                        lambda: candidate_index.invalidate(domain)
+                    )
+            except IntegrityError:
+                return Response(
+                    "Entities conflict with existing entities.",
+                    status=status.HTTP_409_CONFLICT,
+                )
+            saved = dict(zip(new_entities, upserted))
+
+        response = []
+        for entity, created, score in results:
+            if created:
+                entity, created, _ = saved[entity]
+            aliased = False
+            if return_canonical and entity.alias_for_id:
+                aliased = True
+                entity = entity.get_canonical()
+
+            response.append(
+                {
+                    "entity": serialize_entity(entity),
+                    "created": created,
+                    "match_score": score,
+                    "aliased": aliased,
+                }
+            )
+
+        return Response({"results": response}, status=status.HTTP_200_OK)
@@ -1,20 +1,44 @@
+import uuid
+
 from crosswalk.authentication import AuthenticatedView
+from crosswalk.candidates import candidate_index
 from crosswalk.exceptions import NestedAttributesError, ReservedKeyError
 from crosswalk.models import Domain, Entity
-from crosswalk.serializers import EntitySerializer
+from crosswalk.serializers import serialize_entity
 from crosswalk.validators import (
     validate_no_reserved_keys,
     validate_shallow_dict,
 )
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, transaction
 from rest_framework import status
 from rest_framework.response import Response
 
+CONFLICT_MODES = ("skip", "update", "report")
+
 
 class BulkCreate(AuthenticatedView):
     def post(self, request, domain):
+        """
+        Create entities in bulk.
+
+        Pass on_conflict to handle entities whose UUID or attributes
+        already exist in the domain: skip returns the existing entity,
+        update replaces the attributes of an existing entity with the same
+        UUID and report creates nothing if any entity already exists,
+        returning those that do.
+        """
+        on_conflict = request.query_params.get("on_conflict")
+        if on_conflict is not None and on_conflict not in CONFLICT_MODES:
+            return Response(
+                "on_conflict must be one of {}.".format(
+                    ", ".join(CONFLICT_MODES)
+                ),
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         try:
-            domain = Domain.objects.get(slug=domain)
+            domain = Domain.objects.get_cached(slug=domain)
         except ObjectDoesNotExist:
             return Response("Domain not found.", status=status.HTTP_200_OK)
 
@@ -23,7 +47,14 @@ class BulkCreate(AuthenticatedView):
         entity_objects = []
 
         for entity in entities:
-            uuid = entity.pop("uuid", None)
+            pk = entity.pop("uuid", None)
+            if pk is not None:
+                try:
+                    pk = uuid.UUID(str(pk))
+                except ValueError:
+                    return Response(
+                        "Invalid UUID.", status=status.HTTP_400_BAD_REQUEST
+                    )
 
             # Validate entity attributes before creating in bulk
             try:
@@ -43,21 +74,65 @@ class BulkCreate(AuthenticatedView):
 
             entity_objects.append(
                 Entity(
-                    uuid=uuid,
+                    uuid=pk,
                     domain=domain,
                     attributes=entity,
                     created_by=request.user,
                 )
             )
 
+        if on_conflict is not None:
+            return self.upsert(domain, entity_objects, on_conflict)
+
         created_entities = Entity.objects.bulk_create(entity_objects)
+        # bulk_create doesn't send post_save, so rebuild cached candidates.
+        candidate_index.invalidate(domain)
 
         return Response(
             {
                 "entities": [
-                    {"entity": EntitySerializer(entity).data, "created": True}
+                    {"entity": serialize_entity(entity), "created": True}
                     for entity in created_entities
                 ]
             },
             status=status.HTTP_200_OK,
         )
+
+    def upsert(self, domain, entity_objects, on_conflict):
+        if on_conflict == "report":
+            existing = Entity.objects.existing(domain, entity_objects)
+            conflicts = [
+                {"index": index, "entity": serialize_entity(entity)}
+                for index, entity in enumerate(existing)
+                if entity is not None
+            ]
+            if conflicts:
+                return Response(
+                    {"conflicts": conflicts}, status=status.HTTP_409_CONFLICT
+                )
+
+        try:
+            with transaction.atomic():
+                results = Entity.objects.upsert(
+                    domain, entity_objects, update=on_conflict == "update"
+                )
+        except IntegrityError:
+            return Response(
+                "Entities conflict with existing entities.",
+                status=status.HTTP_409_CONFLICT,
+            )
+        transaction.on_commit(lambda: candidate_index.invalidate(domain))
+
+        return Response(
+            {
+                "entities": [
+                    {
+                        "entity": serialize_entity(entity),
+                        "created": created,
+                        "updated": updated,
+                    }
+                    for entity, created, updated in results
+                ]
+            },
+            status=status.HTTP_200_OK,
+        )
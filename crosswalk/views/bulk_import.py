@@ -0,0 +1,54 @@
+from crosswalk.authentication import AuthenticatedView
+from crosswalk.candidates import candidate_index
+from crosswalk.imports import import_entities, parse_rows
+from crosswalk.models import Domain
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class BulkImport(AuthenticatedView):
+    def post(self, request, domain):
+        """
+        Create entities from a newline-delimited JSON or CSV request body.
+
+        The body is read and inserted in chunks, so it's never held in
+        memory all at once. Rows that are invalid or already exist are
+        reported by line number rather than aborting the import. Pass
+        copy=true to insert chunks with Postgres' COPY.
+        """
+        try:
+            domain = Domain.objects.get_cached(slug=domain)
+        except ObjectDoesNotExist:
+            return Response(
+                "Domain not found.", status=status.HTTP_404_NOT_FOUND
+            )
+
+        if request.stream is None:
+            return Response("Empty body.", status=status.HTTP_400_BAD_REQUEST)
+
+        format = "csv" if "csv" in request.content_type else "ndjson"
+        copy = request.query_params.get("copy", "").lower() == "true"
+        chunk_size = getattr(settings, "CROSSWALK_IMPORT_CHUNK_SIZE", 5000)
+
+        try:
+            created, errors = import_entities(
+                domain,
+                parse_rows(request.stream, format),
+                user=request.user,
+                chunk_size=chunk_size,
+                copy=copy,
+            )
+        except UnicodeDecodeError:
+            return Response(
+                "Body must be UTF-8.", status=status.HTTP_400_BAD_REQUEST
+            )
+        finally:
+            # Entities are inserted without post_save, so rebuild cached
+            # candidates, including after a partial import.
+            candidate_index.invalidate(domain)
+
+        return Response(
+            {"created": created, "errors": errors}, status=status.HTTP_200_OK
+        )
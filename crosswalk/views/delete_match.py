@@ -15,7 +15,7 @@ class DeleteMatch(AuthenticatedView):
         block_attrs = request.data.copy()
 
         try:
-            domain = Domain.objects.get(slug=domain)
+            domain = Domain.objects.get_cached(slug=domain)
         except ObjectDoesNotExist:
             return Response(
                 "Domain not found.", status=status.HTTP_404_NOT_FOUND
@@ -24,16 +24,17 @@ class DeleteMatch(AuthenticatedView):
         entities = Entity.objects.filter(domain=domain)
         entities = entities.filter(attributes__contains=block_attrs)
 
-        if entities.count() == 0:
+        try:
+            entity = entities.unique()
+        except Entity.MultipleObjectsReturned:
             return Response(
-                "Entity not found.", status=status.HTTP_404_NOT_FOUND
+                "More than one entity found.", status=status.HTTP_403_FORBIDDEN
             )
-
-        elif entities.count() > 1:
+        if entity is None:
             return Response(
-                "More than one entity found.", status=status.HTTP_403_FORBIDDEN
+                "Entity not found.", status=status.HTTP_404_NOT_FOUND
             )
 
-        entities.delete()
+        entity.delete()
 
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,56 @@
+from crosswalk.authentication import AuthenticatedView
+from crosswalk.models import Domain, Entity
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class DeleteMatchBatch(AuthenticatedView):
+    def post(self, request, domain):
+        """
+        Delete the entity matching each of a list of block attributes.
+
+        Matches are found in one query and deleted together in one
+        transaction. Blocks that match no entity or more than one are
+        reported and skipped. Results are returned in the same order as the
+        blocks.
+        """
+        deletes = request.data.copy().get("deletes")
+        max_size = getattr(settings, "CROSSWALK_MAX_BATCH_SIZE", 10000)
+
+        if not isinstance(deletes, list) or not all(
+            isinstance(block_attrs, dict) for block_attrs in deletes
+        ):
+            return Response(
+                "Invalid deletes.", status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if len(deletes) > max_size:
+            return Response(
+                "Too many deletes. Maximum is {}.".format(max_size),
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            domain = Domain.objects.get_cached(slug=domain)
+        except ObjectDoesNotExist:
+            return Response(
+                "Domain not found.", status=status.HTTP_404_NOT_FOUND
+            )
+
+        results, uuids = [], set()
+        for entities in Entity.objects.block_matches(domain, deletes):
+            if not entities:
+                results.append({"error": "Entity not found."})
+            elif len(entities) > 1:
+                results.append({"error": "More than one entity found."})
+            else:
+                uuids.add(entities[0].pk)
+                results.append({"uuid": entities[0].pk, "deleted": True})
+
+        with transaction.atomic():
+            Entity.objects.filter(pk__in=uuids).delete()
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
@@ -1,6 +1,6 @@
 from crosswalk.authentication import AuthenticatedView
 from crosswalk.models import Domain, Entity
-from crosswalk.serializers import EntitySerializer
+from crosswalk.serializers import serialize_entity
 from django.core.exceptions import ObjectDoesNotExist
 from rest_framework import status
 from rest_framework.response import Response
@@ -19,41 +19,43 @@ class Match(AuthenticatedView):
         query_value = data.get("query_value")
         block_attrs = data.get("block_attrs", {})
         return_canonical = data.get("return_canonical", True)
+        normalized = data.get("normalized", False)
 
         try:
-            domain = Domain.objects.get(slug=domain)
+            domain = Domain.objects.get_cached(slug=domain)
         except ObjectDoesNotExist:
             return Response(
                 "Domain not found.", status=status.HTTP_404_NOT_FOUND
             )
 
-        entities = Entity.objects.filter(domain=domain)
+        if normalized:
+            entities = Entity.objects.normalized_exact(
+                domain, query_field, query_value
+            )
+        else:
+            entities = Entity.objects.exact(domain, query_field, query_value)
         entities = entities.filter(attributes__contains=block_attrs)
-
-        entities = entities.filter(
-            **{"attributes__{}".format(query_field): query_value}
-        )
+        entities = entities.select_related("canonical")
 
         aliased = False
 
-        if entities.count() > 1:
+        try:
+            entity = entities.unique()
+        except Entity.MultipleObjectsReturned:
             return Response(
                 "Found more than one entity. Be more specific?",
                 status=status.HTTP_403_FORBIDDEN,
             )
-        elif entities.count() == 0:
+        if entity is None:
             return Response(
                 "Match not found.", status=status.HTTP_404_NOT_FOUND
             )
-        else:
-            entity = entities.first()
 
-        if return_canonical:
-            while entity.alias_for:
-                aliased = True
-                entity = entity.alias_for
+        if return_canonical and entity.alias_for_id:
+            aliased = True
+            entity = entity.get_canonical()
 
         return Response(
-            {"entity": EntitySerializer(entity).data, "aliased": aliased},
+            {"entity": serialize_entity(entity), "aliased": aliased},
             status=status.HTTP_200_OK,
         )
@@ -1,6 +1,6 @@
 from crosswalk.authentication import AuthenticatedView
 from crosswalk.models import Domain, Entity
-from crosswalk.serializers import EntitySerializer
+from crosswalk.serializers import serialize_entity
 from django.core.exceptions import ObjectDoesNotExist
 from rest_framework import status
 from rest_framework.response import Response
@@ -22,25 +22,36 @@ class MatchOrCreate(AuthenticatedView):
         block_attrs = data.get("block_attrs", {})
         create_attrs = data.get("create_attrs", {})
         return_canonical = data.get("return_canonical", True)
+        normalized = data.get("normalized", False)
 
         try:
-            domain = Domain.objects.get(slug=domain)
+            domain = Domain.objects.get_cached(slug=domain)
         except ObjectDoesNotExist:
             return Response(
                 "Domain not found.", status=status.HTTP_404_NOT_FOUND
             )
 
-        entities = Entity.objects.filter(domain=domain)
+        if normalized:
+            entities = Entity.objects.normalized_exact(
+                domain, query_field, query_value
+            )
+        else:
+            entities = Entity.objects.exact(domain, query_field, query_value)
         entities = entities.filter(attributes__contains=block_attrs)
-
-        entities = entities.filter(
-            **{"attributes__{}".format(query_field): query_value}
-        )
+        entities = entities.select_related("canonical")
 
         created = False
         aliased = False
 
-        if entities.count() == 0:
+        try:
+            entity = entities.unique()
+        except Entity.MultipleObjectsReturned:
+            return Response(
+                "Found more than one entity. Be more specific?",
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if entity is None:
             created = True
             uuid = create_attrs.pop("uuid", None)
             entity = Entity(
@@ -54,22 +65,14 @@ class MatchOrCreate(AuthenticatedView):
                 domain=domain,
             )
             entity.save()
-        elif entities.count() > 1:
-            return Response(
-                "Found more than one entity. Be more specific?",
-                status=status.HTTP_403_FORBIDDEN,
-            )
-        else:
-            entity = entities[0]
 
-        if return_canonical:
-            while entity.alias_for:
-                aliased = True
-                entity = entity.alias_for
+        if return_canonical and entity.alias_for_id:
+            aliased = True
+            entity = entity.get_canonical()
 
         return Response(
             {
-                "entity": EntitySerializer(entity).data,
+                "entity": serialize_entity(entity),
                 "created": created,
                 "aliased": aliased,
             },
@@ -0,0 +1,31 @@
+from crosswalk.authentication import AuthenticatedView, token_cache
+from crosswalk.candidates import candidate_index
+from crosswalk.metrics import enabled, registry
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class Metrics(AuthenticatedView):
+    def get(self, request):
+        """
+        Return this process' request metrics in the Prometheus text format.
+        """
+        if not enabled():
+            return Response(
+                "Metrics are disabled.", status=status.HTTP_404_NOT_FOUND
+            )
+
+        tokens = token_cache.stats()
+        candidates = candidate_index.stats()
+        gauges = {
+            "token_cache_hits_total": tokens["hits"],
+            "token_cache_misses_total": tokens["misses"],
+            "token_cache_size": tokens["size"],
+            "candidate_index_blocks": candidates["blocks"],
+            "candidate_index_candidates": candidates["candidates"],
+        }
+        return HttpResponse(
+            registry.render(gauges),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
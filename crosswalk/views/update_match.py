@@ -5,7 +5,7 @@ from rest_framework.response import Response
 from crosswalk.authentication import AuthenticatedView
 from crosswalk.exceptions import NestedAttributesError, ReservedKeyError
 from crosswalk.models import Domain, Entity
-from crosswalk.serializers import EntitySerializer
+from crosswalk.serializers import serialize_entity
 from crosswalk.validators import full_validation
 
 
@@ -18,7 +18,7 @@ class UpdateMatch(AuthenticatedView):
         data = request.data.copy()
 
         try:
-            domain = Domain.objects.get(slug=domain)
+            domain = Domain.objects.get_cached(slug=domain)
         except ObjectDoesNotExist:
             return Response(
                 "Domain not found.", status=status.HTTP_404_NOT_FOUND
@@ -29,18 +29,18 @@ class UpdateMatch(AuthenticatedView):
             attributes__contains=data.get("block_attrs", {})
         )
 
-        if entities.count() == 0:
-            return Response(
-                "Entity not found.", status=status.HTTP_404_NOT_FOUND
-            )
-
-        elif entities.count() > 1:
+        try:
+            entity = entities.unique()
+        except Entity.MultipleObjectsReturned:
             return Response(
                 "Found more than one entity. Be more specific?",
                 status=status.HTTP_403_FORBIDDEN,
             )
+        if entity is None:
+            return Response(
+                "Entity not found.", status=status.HTTP_404_NOT_FOUND
+            )
 
-        entity = entities.first()
         update_attrs = data.get("update_attrs", {})
 
         # validate data
@@ -56,6 +56,6 @@ class UpdateMatch(AuthenticatedView):
         entity.save()
 
         return Response(
-            {"entity": EntitySerializer(entities.first()).data},
+            {"entity": serialize_entity(entity)},
             status=status.HTTP_200_OK,
         )
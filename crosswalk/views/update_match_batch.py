@@ -0,0 +1,103 @@
+from crosswalk.authentication import AuthenticatedView
+from crosswalk.candidates import candidate_index
+from crosswalk.exceptions import NestedAttributesError, ReservedKeyError
+from crosswalk.models import Domain, Entity
+from crosswalk.models.entity import DERIVED_FIELDS
+from crosswalk.serializers import serialize_entity
+from crosswalk.validators import full_validation
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class UpdateMatchBatch(AuthenticatedView):
+    def post(self, request, domain):
+        """
+        Update the entity matching each of a list of block attributes with
+        its update attributes.
+
+        Matches are found in one query and all updates are written in one
+        transaction. Updates whose block matches no entity or more than one,
+        or whose update attributes aren't valid, are reported and skipped.
+        Results are returned in the same order as the updates.
+        """
+        updates = request.data.copy().get("updates")
+        max_size = getattr(settings, "CROSSWALK_MAX_BATCH_SIZE", 10000)
+
+        if not isinstance(updates, list) or not all(
+            isinstance(u, dict)
+            and isinstance(u.get("block_attrs", {}), dict)
+            and isinstance(u.get("update_attrs", {}), dict)
+            for u in updates
+        ):
+            return Response(
+                "Invalid updates.", status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if len(updates) > max_size:
+            return Response(
+                "Too many updates. Maximum is {}.".format(max_size),
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            domain = Domain.objects.get_cached(slug=domain)
+        except ObjectDoesNotExist:
+            return Response(
+                "Domain not found.", status=status.HTTP_404_NOT_FOUND
+            )
+
+        matches = Entity.objects.block_matches(
+            domain, [u.get("block_attrs", {}) for u in updates]
+        )
+
+        results, changed = [], {}
+        now = timezone.now()
+        for update, entities in zip(updates, matches):
+            if not entities:
+                results.append({"error": "Entity not found."})
+                continue
+            if len(entities) > 1:
+                results.append(
+                    {"error": "Found more than one entity. Be more specific?"}
+                )
+                continue
+            update_attrs = update.get("update_attrs", {})
+            try:
+                full_validation(update_attrs)
+            except (NestedAttributesError, ReservedKeyError):
+                results.append(
+                    {"error": "Update data could not be validated."}
+                )
+                continue
+
+            # Apply every update of an entity matched more than once.
+            entity = changed.setdefault(entities[0].pk, entities[0])
+            entity.attributes = {**entity.attributes, **update_attrs}
+            results.append({"entity": entity, "updated": True})
+
+        for entity in changed.values():
+            entity.set_derived_fields()
+            entity.updated = now
+
+        try:
+            with transaction.atomic():
+                Entity.objects.bulk_update(
+                    changed.values(),
+                    ["attributes", *DERIVED_FIELDS, "updated"],
+                )
+        except IntegrityError:
+            return Response(
+                "Updates would duplicate existing entities.",
+                status=status.HTTP_409_CONFLICT,
+            )
+        # bulk_update doesn't send post_save, so rebuild cached candidates.
+        candidate_index.invalidate(domain)
+
+        for result in results:
+            if "entity" in result:
+                result["entity"] = serialize_entity(result["entity"])
+        return Response({"results": results}, status=status.HTTP_200_OK)
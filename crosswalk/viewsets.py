@@ -1,14 +1,26 @@
-from rest_framework import viewsets
+import json
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import StreamingHttpResponse
+from rest_framework import status, viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from crosswalk.authentication import TokenAuthentication
+from crosswalk.metrics import InstrumentedViewMixin
 
 from .models import Domain, Entity
-from .serializers import DomainSerializer, EntitySerializer
+from .serializers import (
+    DomainSerializer,
+    EntitySerializer,
+    iter_serialized_entities,
+    serialize_entities,
+)
 
 
-class AuthenticatedViewSet(viewsets.ModelViewSet):
+class AuthenticatedViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     permission_classes = (IsAuthenticated,)
     authentication_classes = (TokenAuthentication,)
     paginator = None
@@ -22,7 +34,11 @@ class DomainViewSet(AuthenticatedViewSet):
         queryset = Domain.objects.all()
         parent = self.request.query_params.get("parent", None)
         if parent:
-            queryset = queryset.filter(parent__slug=parent)
+            try:
+                parent = Domain.objects.get_cached(slug=parent)
+            except ObjectDoesNotExist:
+                return queryset.none()
+            queryset = queryset.filter(parent=parent)
         return queryset
 
 
@@ -30,15 +46,78 @@ class EntityDomainViewSet(AuthenticatedViewSet):
     serializer_class = EntitySerializer
 
     def get_queryset(self):
-        domain = self.kwargs["domain"]
-        return Entity.objects.filter(domain__slug=domain)
+        try:
+            domain = Domain.objects.get_cached(slug=self.kwargs["domain"])
+        except ObjectDoesNotExist:
+            return Entity.objects.none()
+        return Entity.objects.filter(domain=domain)
 
     def list(self, request, domain):
-        """Allow passing block attr params to filter queryset."""
+        """
+        Allow passing block attr params to filter queryset.
+
+        Pass page_size, and the cursor returned with each page, to page
+        through entities in UUID order. Or pass stream=ndjson or stream=json
+        to stream every entity without loading them all in memory.
+        """
         params = request.query_params.copy()
+        stream = params.pop("stream", [None])[0]
+        cursor = params.pop("cursor", [None])[0]
+        page_size = params.pop("page_size", [None])[0]
         queryset = self.get_queryset().filter(attributes__contains=params)
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+
+        if page_size is not None:
+            return self.paginate(queryset, page_size, cursor)
+        if stream == "ndjson":
+            return StreamingHttpResponse(
+                self.stream_ndjson(queryset),
+                content_type="application/x-ndjson",
+            )
+        if stream == "json":
+            return StreamingHttpResponse(
+                self.stream_json(queryset), content_type="application/json"
+            )
+        return Response(serialize_entities(queryset))
+
+    def paginate(self, queryset, page_size, cursor):
+        max_size = getattr(settings, "CROSSWALK_MAX_PAGE_SIZE", 10000)
+        try:
+            page_size = int(page_size)
+            if cursor:
+                queryset = queryset.filter(uuid__gt=uuid.UUID(cursor))
+        except ValueError:
+            return Response(
+                "Invalid page_size or cursor.",
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not 0 < page_size <= max_size:
+            return Response(
+                "page_size must be between 1 and {}.".format(max_size),
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        results = serialize_entities(
+            queryset.order_by("uuid")[: page_size + 1]
+        )
+        next_cursor = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            next_cursor = results[-1]["uuid"]
+        return Response({"results": results, "next": next_cursor})
+
+    def stream_ndjson(self, queryset):
+        for entity in iter_serialized_entities(queryset, self.chunk_size):
+            yield json.dumps(entity) + "\n"
+
+    def stream_json(self, queryset):
+        separator = "["
+        for entity in iter_serialized_entities(queryset, self.chunk_size):
+            yield separator + json.dumps(entity)
+            separator = ","
+        yield "[]" if separator == "[" else "]"
+
+    @property
+    def chunk_size(self):
+        return getattr(settings, "CROSSWALK_STREAM_CHUNK_SIZE", 2000)
 
 
 class EntityViewSet(AuthenticatedViewSet):
@@ -33,5 +33,6 @@ setup(
         "python-Levenshtein",
         "fuzzywuzzy",
     ],
+    extras_require={"rapidfuzz": ["rapidfuzz", "numpy"]},
     python_requires=">=3.6",
 )